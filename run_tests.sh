@@ -15,7 +15,12 @@ fi
 # Run tests with pytest if available, otherwise use unittest
 if command -v pytest &> /dev/null; then
     echo "Running tests with pytest..."
-    pytest tests/ -v --cov=src --cov-report=term-missing
+    # Tests are independent, so spread them over all cores when xdist is installed
+    PARALLEL_ARGS=""
+    if python -c "import xdist" &> /dev/null; then
+        PARALLEL_ARGS="-n auto --dist=loadfile"
+    fi
+    pytest tests/ -v --cov=src --cov-report=term-missing $PARALLEL_ARGS
 else
     echo "pytest not found. Running tests with unittest..."
     python -m unittest discover -s tests -p "test_*.py" -v
@@ -34,11 +34,13 @@ setup(
         "audio": ["essentia>=2.1b6"],
         "scraping": [
             "selenium>=4.0.0",
+            "lxml>=4.9.0",
         ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
             "pytest-mock>=3.10.0",
+            "pytest-xdist>=3.0.0",
             "black>=23.0.0",
             "flake8>=6.0.0",
             "pylint>=2.17.0",
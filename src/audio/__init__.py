@@ -1,10 +1,14 @@
 """Audio processing modules for analysis and stem separation."""
 
-from .analysis import analyze_audio_bpm_key
-from .stem_splitter import split_audio_stems
+from ..utils.lazy_import import lazy_exports
 
-__all__ = [
-    "analyze_audio_bpm_key",
-    "split_audio_stems",
-]
+# Submodules are imported on first attribute access (PEP 562), so importing
+# the package doesn't pull in the analysis or Demucs code
+_LAZY_ATTRS = {
+    "analyze_audio_bpm_key": ".analysis",
+    "split_audio_stems": ".stem_splitter",
+}
 
+__all__ = list(_LAZY_ATTRS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_ATTRS)
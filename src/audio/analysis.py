@@ -1,30 +1,51 @@
 """Audio analysis using Essentia library."""
 
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
 from typing import Optional, Tuple, List
+from ..utils.file_utils import get_cache_dir
+from ..utils.lazy_import import LazyImportTester
 
-# Check if Essentia is available
-try:
-    import essentia.standard as es
-    ESSENTIA_AVAILABLE = True
-except ImportError:
-    ESSENTIA_AVAILABLE = False
+logger = logging.getLogger(__name__)
 
+# Essentia is imported on first use; this only checks that it is installed
+ESSENTIA_AVAILABLE = LazyImportTester("essentia")
 
+# RhythmExtractor2013 requires 44.1 kHz input, but key detection only uses
+# content below a few kHz, so it runs on a downsampled copy of the signal
+KEY_SAMPLE_RATE = 22050
+
+ANALYSIS_SOURCE = "Audio analysis (Essentia)"
+
+# Results are cached by file content; files larger than this are keyed by
+# size and modification time instead of being hashed
+_CACHE_FILENAME = "analysis.json"
+_HASH_SIZE_LIMIT = 512 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
 def is_essentia_available() -> bool:
     """Check if Essentia library is available."""
-    return ESSENTIA_AVAILABLE
+    return bool(ESSENTIA_AVAILABLE)
 
 
 def analyze_audio_bpm_key(
     wav_path: str,
-    sample_rate: int = 44100
+    sample_rate: int = 44100,
+    max_duration: Optional[float] = 180.0
 ) -> Tuple[Optional[str], Optional[str], List[str]]:
     """
     Analyze audio file to detect BPM and key using Essentia.
     
     Args:
-        wav_path: Path to WAV file
+        wav_path: Path to audio file (any format FFmpeg can decode)
         sample_rate: Sample rate for analysis (default: 44100)
+        max_duration: Only analyze the first N seconds; None for the whole
+            file (default: 180)
         
     Returns:
         Tuple of (bpm, key, sources) where:
@@ -39,30 +60,160 @@ def analyze_audio_bpm_key(
         return None, None, []
     
     try:
-        print("Analyzing audio file for BPM and key...")
+        import essentia
+        import essentia.standard as es
+        import essentia.streaming as ess
+    except ImportError:
+        return None, None, []
+    
+    cache_key = _analysis_cache_key(wav_path, sample_rate, max_duration)
+    cached = _load_cached_analysis(cache_key)
+    if cached:
+        return cached["bpm"], cached["key"], [ANALYSIS_SOURCE]
+    
+    try:
+        logger.info("Analyzing audio file for BPM and key...")
+        
+        # Read the native sample rate from the header so each branch below
+        # resamples at most once, directly from the decoded signal
+        reader = es.MetadataReader(filename=wav_path, failOnError=True)
+        metadata = dict(zip(reader.outputNames(), reader()))
+        native_rate = int(metadata["sampleRate"])
+        
+        # Build a single streaming network so the file is decoded once and
+        # both extractors consume the same signal in one pass
+        loader = ess.AudioLoader(filename=wav_path)
+        mixer = ess.MonoMixer()
+        rhythm_extractor = ess.RhythmExtractor2013(method="multifeature")
+        key_sample_rate = min(sample_rate, KEY_SAMPLE_RATE)
+        key_extractor = ess.KeyExtractor(sampleRate=key_sample_rate)
+        pool = essentia.Pool()
         
-        # Load audio file
-        loader = es.MonoLoader(filename=wav_path, sampleRate=sample_rate)
-        audio = loader()
+        loader.audio >> mixer.audio
+        loader.numberChannels >> mixer.numberChannels
+        loader.sampleRate >> None
+        loader.md5 >> None
+        loader.bit_rate >> None
+        loader.codec >> None
         
-        # Detect BPM using RhythmExtractor2013
-        rhythm_extractor = es.RhythmExtractor2013(method="multifeature")
-        bpm, beats, beats_confidence, _, beats_intervals = rhythm_extractor(audio)
-        bpm_str = str(int(round(bpm)))
+        # Tempo and key are stable enough that a few minutes is representative
+        signal = mixer.audio
+        if max_duration:
+            trimmer = ess.Trimmer(sampleRate=native_rate, endTime=max_duration)
+            signal >> trimmer.signal
+            signal = trimmer.signal
         
-        # Detect key using KeyExtractor
-        key_extractor = es.KeyExtractor()
-        key, scale, strength = key_extractor(audio)
+        _resample(ess, signal, native_rate, sample_rate) >> rhythm_extractor.signal
+        _resample(ess, signal, native_rate, key_sample_rate) >> key_extractor.audio
+        
+        rhythm_extractor.bpm >> (pool, "rhythm.bpm")
+        rhythm_extractor.ticks >> None
+        rhythm_extractor.confidence >> None
+        rhythm_extractor.estimates >> None
+        rhythm_extractor.bpmIntervals >> None
+        
+        key_extractor.key >> (pool, "tonal.key")
+        key_extractor.scale >> (pool, "tonal.scale")
+        key_extractor.strength >> None
+        
+        essentia.run(loader)
+        
+        bpm_str = str(int(round(_pool_value(pool, "rhythm.bpm"))))
         
         # Essentia returns key like "A" and scale like "major" or "minor"
         # Format as "A Major" or "A Minor"
+        key = _pool_value(pool, "tonal.key")
+        scale = _pool_value(pool, "tonal.scale")
         detected_key = f"{key} {scale.capitalize()}"
         
-        return bpm_str, detected_key, ["Audio analysis (Essentia)"]
+        _store_cached_analysis(cache_key, bpm_str, detected_key)
+        
+        return bpm_str, detected_key, [ANALYSIS_SOURCE]
     
     except Exception as e:
-        print(f"Audio analysis failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.warning("Audio analysis failed: %s", e, exc_info=True)
         return None, None, []
 
+
+def _resample(ess, signal, input_rate: int, output_rate: int):
+    """Connect a Resample stage to a streaming output if the rates differ."""
+    if input_rate == output_rate:
+        return signal
+    resampler = ess.Resample(inputSampleRate=input_rate, outputSampleRate=output_rate)
+    signal >> resampler.signal
+    return resampler.signal
+
+
+def _pool_value(pool, name: str):
+    """Return the last value a streaming output stored in an Essentia pool."""
+    value = pool[name]
+    if isinstance(value, str) or not hasattr(value, "__len__"):
+        return value
+    return value[-1]
+
+
+def _analysis_cache_key(
+    wav_path: str,
+    sample_rate: int,
+    max_duration: Optional[float]
+) -> Optional[str]:
+    """
+    Build the cache key for an analysis run.
+    
+    Returns:
+        Cache key string, or None if the file can't be read
+    """
+    try:
+        stat = os.stat(wav_path)
+        if stat.st_size > _HASH_SIZE_LIMIT:
+            fingerprint = f"{os.path.abspath(wav_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        else:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(wav_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            fingerprint = digest.hexdigest()
+    except OSError:
+        return None
+    
+    return f"{fingerprint}:{sample_rate}:{max_duration}"
+
+
+def _read_analysis_cache() -> dict:
+    """Read the analysis cache file, returning an empty dict if unusable."""
+    try:
+        with open(os.path.join(get_cache_dir(), _CACHE_FILENAME), encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _load_cached_analysis(cache_key: Optional[str]) -> Optional[dict]:
+    """Look up a cached analysis result."""
+    if cache_key is None:
+        return None
+    return _read_analysis_cache().get(cache_key)
+
+
+def _store_cached_analysis(cache_key: Optional[str], bpm: str, key: str) -> None:
+    """Add an analysis result to the cache, replacing the file atomically."""
+    if cache_key is None:
+        return
+    
+    try:
+        cache_dir = get_cache_dir()
+        cache = _read_analysis_cache()
+        cache[cache_key] = {"bpm": bpm, "key": key}
+        
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, os.path.join(cache_dir, _CACHE_FILENAME))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError:
+        # Caching is best-effort
+        pass
@@ -1,25 +1,60 @@
 """Audio stem separation using Demucs."""
 
+import functools
+import logging
 import os
-import shutil
-from typing import Tuple
+import re
+import subprocess
+from typing import Callable, Optional, Tuple
+from ..utils.file_utils import move_file
+from ..utils.lazy_import import LazyImportTester
 from ..utils.subprocess_utils import run_command
 
+logger = logging.getLogger(__name__)
+
+# Demucs is imported on first use; this only checks that it is installed
+DEMUCS_AVAILABLE = LazyImportTester("demucs")
+
+DEMUCS_MODEL = "htdemucs"
+
+# Seconds per inference chunk (htdemucs's training length) and the fraction
+# of each chunk shared with its neighbour for overlap-add
+DEMUCS_SEGMENT = 7.8
+DEMUCS_OVERLAP = 0.25
+
+# Percentage from Demucs's tqdm progress lines, e.g. " 42%|████      | 105.3/250.8"
+_PERCENT_RE = re.compile(r"(\d+)%")
+
+# Demucs uses the CPU unless told otherwise, even when a GPU is present
+TORCH_AVAILABLE = LazyImportTester("torch")
+
 
 def split_audio_stems(
     input_path: str,
     output_dir: str = None,
     two_stems: bool = True,
-    stem_type: str = "vocals"
+    stem_type: str = "vocals",
+    dest_dir: Optional[str] = None,
+    on_progress: Optional[Callable[[int], None]] = None
 ) -> Tuple[str, str]:
     """
     Split audio file into stems using Demucs.
     
+    Two-stem splits run in this process with a model loaded once and reused
+    across calls when Demucs is importable; otherwise, and for full splits,
+    the Demucs CLI is run.
+    
     Args:
         input_path: Path to input audio file
-        output_dir: Directory for output files (defaults to current directory)
+        output_dir: Directory the Demucs CLI writes its raw output to before
+            the stems are moved (defaults to ./demucs_output). Not used when
+            the model runs in process, which writes the stems directly
         two_stems: If True, split into two stems (target + rest)
         stem_type: Type of stem to isolate when two_stems=True (default: "vocals")
+        dest_dir: Directory the stems are saved to (defaults to the current
+            working directory)
+        on_progress: Called with the percentage of the separation done (0-100)
+            as Demucs reports it
         
     Returns:
         Tuple of (vocals_output_path, instrumental_output_path)
@@ -29,44 +64,235 @@ def split_audio_stems(
         FileNotFoundError: If expected output files are not created
     """
     basename = os.path.splitext(os.path.basename(input_path))[0]
+    if dest_dir is None:
+        dest_dir = os.getcwd()
+    out_vocals = os.path.join(dest_dir, f"{basename}_vocals.wav")
+    out_instrumental = os.path.join(dest_dir, f"{basename}_instrumental.wav")
+    
+    # Reuse a model loaded in this process when Demucs is importable
+    model = _get_model() if two_stems else None
+    if model is not None:
+        _separate_in_process(model, input_path, stem_type, out_vocals, out_instrumental)
+        if on_progress:
+            on_progress(100)
+    else:
+        if output_dir is None:
+            output_dir = os.path.join(os.getcwd(), "demucs_output")
+        
+        vocals_path, instrumental_path = _prepare_cli_output(output_dir, basename)
+        
+        # Build Demucs command
+        cmd = ["demucs"]
+        if two_stems:
+            cmd.extend(["--two-stems", stem_type])
+        device = get_torch_device()
+        if device:
+            cmd.extend(["-d", device])
+        cmd.extend(["-o", output_dir, input_path])
+        
+        # Run Demucs
+        if on_progress:
+            _run_with_progress(cmd, on_progress)
+        else:
+            run_command(cmd)
+        
+        # Move results next to each other with descriptive names
+        _collect_cli_output(vocals_path, instrumental_path, out_vocals, out_instrumental)
+    
+    logger.info("Vocals saved to %s", out_vocals)
+    logger.info("Instrumental saved to %s", out_instrumental)
+    
+    return out_vocals, out_instrumental
+
+
+@functools.lru_cache(maxsize=1)
+def get_torch_device() -> Optional[str]:
+    """
+    Pick the fastest PyTorch device available for Demucs.
     
-    if output_dir is None:
-        output_dir = os.path.join(os.getcwd(), "demucs_output")
+    Returns:
+        "cuda" or "mps" if that backend is usable, or None to keep
+        Demucs's CPU default
+    """
+    if not TORCH_AVAILABLE:
+        return None
+    try:
+        import torch
+    except ImportError:
+        return None
     
-    # Clean up old output directory
-    if os.path.exists(output_dir):
-        shutil.rmtree(output_dir)
-    os.makedirs(output_dir)
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    """
+    Load the Demucs model once per process.
     
-    # Build Demucs command
-    cmd = ["demucs"]
-    if two_stems:
-        cmd.extend(["--two-stems", stem_type])
-    cmd.extend(["-o", output_dir, input_path])
+    Returns:
+        Pretrained Demucs model in eval mode, or None if Demucs can't be
+        imported, in which case the CLI is used
+    """
+    if not DEMUCS_AVAILABLE:
+        return None
+    try:
+        from demucs.pretrained import get_model
+    except ImportError:
+        return None
+    model = get_model(DEMUCS_MODEL)
+    model.eval()
+    return model
+
+
+def _separate_in_process(
+    model,
+    input_path: str,
+    stem_type: str,
+    target_path: str,
+    rest_path: str
+) -> None:
+    """
+    Separate one stem from the rest with an already loaded Demucs model.
+    
+    The track is processed in overlapping segments, so peak memory stays
+    bounded regardless of track length.
+    
+    Args:
+        model: Model returned by _get_model
+        input_path: Path to input audio file
+        stem_type: Stem to isolate (e.g., "vocals")
+        target_path: Output path for the isolated stem
+        rest_path: Output path for everything else mixed together
+    """
+    from demucs.apply import apply_model
+    from demucs.audio import AudioFile, save_audio
     
-    # Run Demucs
-    run_command(cmd)
+    # Decode through FFmpeg like the CLI does, so any downloaded codec works
+    wav = AudioFile(input_path).read(
+        streams=0,
+        samplerate=model.samplerate,
+        channels=model.audio_channels
+    )
     
-    # Locate output files
-    stem_folder = os.path.join(output_dir, "htdemucs", basename)
+    # Same normalization the Demucs CLI applies around inference
+    ref = wav.mean(0)
+    mean, std = ref.mean(), ref.std()
+    wav = (wav - mean) / std
+    
+    sources = apply_model(
+        model,
+        wav[None],
+        device=get_torch_device() or "cpu",
+        segment=DEMUCS_SEGMENT,
+        overlap=DEMUCS_OVERLAP,
+        split=True
+    )[0]
+    sources = sources * std + mean
+    
+    stem_index = model.sources.index(stem_type)
+    target = sources[stem_index]
+    rest = sources.sum(0) - target
+    
+    save_audio(target, target_path, samplerate=model.samplerate)
+    save_audio(rest, rest_path, samplerate=model.samplerate)
+
+
+def _run_with_progress(cmd: list, on_progress: Callable[[int], None]) -> None:
+    """
+    Run the Demucs CLI, reporting the progress it prints.
+    
+    Args:
+        cmd: Demucs command and arguments as a list
+        on_progress: Called with each percentage Demucs reports (0-100)
+        
+    Raises:
+        subprocess.CalledProcessError: If Demucs exits with an error
+    """
+    # Text mode splits on the carriage returns tqdm uses to redraw its line
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+        text=True
+    )
+    try:
+        for line in proc.stdout:
+            match = _PERCENT_RE.search(line)
+            if match:
+                on_progress(min(int(match.group(1)), 100))
+        returncode = proc.wait()
+    except BaseException:
+        # Don't leave Demucs running after Ctrl-C
+        proc.terminate()
+        proc.wait()
+        raise
+    finally:
+        proc.stdout.close()
+    
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+    on_progress(100)
+
+
+def _prepare_cli_output(output_dir: str, basename: str) -> Tuple[str, str]:
+    """
+    Get the Demucs CLI's output directory ready for a two-stem split.
+    
+    Demucs writes to a deterministic subfolder and overwrites in place, so
+    only stale results for this track are removed, not the whole tree.
+    
+    Args:
+        output_dir: Directory passed to Demucs with -o
+        basename: Input file name without its extension
+        
+    Returns:
+        Tuple of (vocals_path, instrumental_path) Demucs will write
+    """
+    stem_folder = os.path.join(output_dir, DEMUCS_MODEL, basename)
     vocals_path = os.path.join(stem_folder, "vocals.wav")
     instrumental_path = os.path.join(stem_folder, "no_vocals.wav")
+    os.makedirs(output_dir, exist_ok=True)
+    _remove_if_exists(vocals_path)
+    _remove_if_exists(instrumental_path)
+    return vocals_path, instrumental_path
+
+
+def _collect_cli_output(
+    vocals_path: str,
+    instrumental_path: str,
+    out_vocals: str,
+    out_instrumental: str
+) -> None:
+    """
+    Move the stems the Demucs CLI wrote to their final paths.
     
+    Args:
+        vocals_path: Vocals file written by Demucs
+        instrumental_path: Instrumental file written by Demucs
+        out_vocals: Destination for the vocals
+        out_instrumental: Destination for the instrumental
+        
+    Raises:
+        FileNotFoundError: If Demucs didn't write one of the stems
+    """
     if not os.path.exists(vocals_path):
         raise FileNotFoundError(f"Expected vocals file not found: {vocals_path}")
     if not os.path.exists(instrumental_path):
         raise FileNotFoundError(f"Expected instrumental file not found: {instrumental_path}")
     
-    # Copy results to current working directory with descriptive names
-    cwd = os.getcwd()
-    out_vocals = os.path.join(cwd, f"{basename}_vocals.wav")
-    out_instrumental = os.path.join(cwd, f"{basename}_instrumental.wav")
-    
-    shutil.copyfile(vocals_path, out_vocals)
-    shutil.copyfile(instrumental_path, out_instrumental)
-    
-    print(f"Vocals saved to {out_vocals}")
-    print(f"Instrumental saved to {out_instrumental}")
-    
-    return out_vocals, out_instrumental
+    move_file(vocals_path, out_vocals)
+    move_file(instrumental_path, out_instrumental)
+
 
+def _remove_if_exists(path: str) -> None:
+    """Delete a file, ignoring it if it doesn't exist."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """CLI for splitting audio stems using Demucs."""
 
+import logging
 import sys
 import os
 from ..audio.stem_splitter import split_audio_stems
@@ -12,6 +13,11 @@ def main():
         print("Usage: python split_stems.py path/to/audiofile.wav")
         sys.exit(1)
 
+    # Library modules report progress through logging
+    logging.basicConfig(format="%(message)s")
+    # Only this package's progress messages; third-party loggers stay at WARNING
+    logging.getLogger(__package__.split(".")[0]).setLevel(logging.INFO)
+
     audio_path = sys.argv[1]
 
     if not os.path.isfile(audio_path):
@@ -1,53 +1,65 @@
 #!/usr/bin/env python3
 """CLI for downloading YouTube audio and extracting track information."""
 
+import logging
 import os
 import sys
-import warnings
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote_plus
-from tqdm import tqdm
-
-# Suppress warnings for cleaner output
-warnings.filterwarnings('ignore')
 
 from ..utils.file_utils import ensure_dependency
 from ..utils.sanitization import sanitize_filename
 from ..utils.subprocess_utils import run_command
 from ..downloader.youtube import download_youtube_audio, get_youtube_title
-from ..audio.analysis import analyze_audio_bpm_key, is_essentia_available
-from ..scrapers.tunebat import scrape_tunebat_info, is_tunebat_available
+
+
+class TqdmLoggingHandler(logging.Handler):
+    """Logging handler that prints through tqdm so progress bars aren't broken up."""
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        from tqdm import tqdm
+        
+        try:
+            tqdm.write(self.format(record))
+        except Exception:
+            self.handleError(record)
 
 
 def write_track_info_markdown(
     md_path: str,
     title: str,
     url: str,
-    wav_basename: str,
+    audio_basename: str,
     bpm: str,
     key: str,
     camelot: str,
     sources: list
 ) -> None:
     """Write track information to a markdown file."""
+    from datetime import datetime
+    
     now = datetime.now().isoformat(timespec="seconds")
     
+    lines = [
+        f"# {title}\n\n",
+        f"- URL: {url}\n",
+        f"- Downloaded audio: {audio_basename}\n",
+        f"- Detected BPM: {bpm if bpm else 'Unknown'}\n",
+        f"- Detected Key: {key if key else 'Unknown'}\n",
+    ]
+    if camelot:
+        lines.append(f"- Camelot: {camelot}\n")
+    if sources:
+        lines.append("- Detection Method:\n")
+        lines.extend(f"  - {s}\n" for s in sources)
+    # Helpful search link
+    search_q = quote_plus(f'{title} bpm key')
+    lines.append(f"\n- Verify at: https://www.google.com/search?q={search_q}\n")
+    lines.append(f"\n_Generated: {now}_\n")
+    
+    # Build the whole file first so it goes out in a single write
     with open(md_path, "w", encoding="utf-8") as f:
-        f.write(f"# {title}\n\n")
-        f.write(f"- URL: {url}\n")
-        f.write(f"- Downloaded WAV: {wav_basename}\n")
-        f.write(f"- Detected BPM: {bpm if bpm else 'Unknown'}\n")
-        f.write(f"- Detected Key: {key if key else 'Unknown'}\n")
-        if camelot:
-            f.write(f"- Camelot: {camelot}\n")
-        if sources:
-            f.write("- Detection Method:\n")
-            for s in sources:
-                f.write(f"  - {s}\n")
-        # Helpful search link
-        search_q = quote_plus(f'{title} bpm key')
-        f.write(f"\n- Verify at: https://www.google.com/search?q={search_q}\n")
-        f.write(f"\n_Generated: {now}_\n")
+        f.write("".join(lines))
 
 
 def print_track_summary(title: str, bpm: str, key: str, camelot: str, sources: list, target_dir: str) -> None:
@@ -66,15 +78,21 @@ def print_track_summary(title: str, bpm: str, key: str, camelot: str, sources: l
     print(f"\n✓ Done! Files saved to:\n  {target_dir}\n")
 
 
-def detect_track_metadata(title: str, wav_path: str, progress_bar: tqdm = None) -> tuple:
+def detect_track_metadata(title: str, audio_path: str, progress_bar=None) -> tuple:
     """
     Detect BPM, key, and Camelot information for a track.
     
     Returns:
         Tuple of (bpm, key, camelot, sources)
     """
-    bpm, key, sources = None, None, []
+    # Deferred so --help and argument errors don't pay for the scraper/analysis stack
+    from ..audio.analysis import analyze_audio_bpm_key, is_essentia_available
+    from ..scrapers.tunebat import scrape_tunebat_info, is_tunebat_available
+    
+    bpm, key = None, None
     camelot = None
+    # Insertion-ordered set of detection methods, reported in the order used
+    sources = {}
     
     # Try TuneBat first (most accurate)
     if is_tunebat_available():
@@ -84,11 +102,10 @@ def detect_track_metadata(title: str, wav_path: str, progress_bar: tqdm = None)
         tunebat_bpm, tunebat_key, tunebat_camelot = scrape_tunebat_info(title, silent=True)
         if tunebat_bpm:
             bpm = tunebat_bpm
-            sources.append("TuneBat")
+            sources.setdefault("TuneBat")
         if tunebat_key:
             key = tunebat_key
-            if "TuneBat" not in sources:
-                sources.append("TuneBat")
+            sources.setdefault("TuneBat")
         if tunebat_camelot:
             camelot = tunebat_camelot
         if progress_bar:
@@ -102,13 +119,12 @@ def detect_track_metadata(title: str, wav_path: str, progress_bar: tqdm = None)
         if progress_bar:
             progress_bar.set_description("🎵 Analyzing audio...")
             progress_bar.update(10)
-        essentia_bpm, essentia_key, essentia_sources = analyze_audio_bpm_key(wav_path)
+        essentia_bpm, essentia_key, essentia_sources = analyze_audio_bpm_key(audio_path)
         if essentia_bpm and not bpm:
             bpm = essentia_bpm
         if essentia_key and not key:
             key = essentia_key
-        if essentia_sources:
-            sources.extend(essentia_sources)
+        sources.update(dict.fromkeys(essentia_sources))
         if progress_bar:
             progress_bar.update(30)
     else:
@@ -128,7 +144,48 @@ def detect_track_metadata(title: str, wav_path: str, progress_bar: tqdm = None)
     if progress_bar:
         progress_bar.update(10)
     
-    return bpm, key, camelot, sources
+    return bpm, key, camelot, list(sources)
+
+
+def split_stems_with_progress(audio_path: str, target_dir: str, progress_bar) -> None:
+    """
+    Split a downloaded track into vocal and instrumental stems with Demucs.
+    
+    Failures are reported on the progress bar rather than raised, so the
+    rest of the pipeline can still finish.
+    
+    Args:
+        audio_path: Path to the downloaded audio file
+        target_dir: Directory the stem files are written to
+        progress_bar: tqdm progress bar to advance
+    """
+    from ..audio.stem_splitter import split_audio_stems
+    
+    try:
+        progress_bar.set_description("✂️  Separating audio...")
+        progress_bar.update(10)
+        
+        # Demucs's own progress fills the bar up to the final step
+        start = progress_bar.n
+        span = 80
+        
+        def on_progress(percent: int) -> None:
+            progress_bar.n = start + percent * span // 100
+            progress_bar.refresh()
+        
+        split_audio_stems(
+            os.path.join(target_dir, os.path.basename(audio_path)),
+            output_dir=os.path.join(target_dir, "demucs_output"),
+            dest_dir=target_dir,
+            on_progress=on_progress
+        )
+        
+        progress_bar.n = start + span
+        progress_bar.update(10)
+        progress_bar.set_description("✂️  Stems complete")
+        
+    except Exception as e:
+        progress_bar.set_description(f"✂️  Stem split failed")
 
 
 def main():
@@ -138,6 +195,19 @@ def main():
         print("Example: yt 'https://youtube.com/...' 99 'G Major'")
         sys.exit(1)
 
+    import warnings
+    from tqdm import tqdm
+    
+    # Suppress warnings for cleaner output
+    warnings.filterwarnings('ignore')
+    
+    # Route library messages above the progress bars instead of through them
+    handler = TqdmLoggingHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.getLogger().addHandler(handler)
+    # Only this package's progress messages; third-party loggers stay at WARNING
+    logging.getLogger(__package__.split(".")[0]).setLevel(logging.INFO)
+
     url = sys.argv[1]
     manual_bpm = sys.argv[2] if len(sys.argv) >= 3 else None
     manual_key = sys.argv[3] if len(sys.argv) >= 4 else None
@@ -173,9 +243,10 @@ def main():
          tqdm(total=100, desc="✂️  Splitting stems", position=2, leave=True,
               bar_format='{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt}') as stems_bar:
         
-        # Download WAV into target_dir
+        # Download audio into target_dir, keeping YouTube's original codec;
+        # Essentia and Demucs both decode it through FFmpeg
         try:
-            wav_path = download_youtube_audio(url, target_dir, audio_format="wav", progress_bar=download_bar)
+            audio_path = download_youtube_audio(url, target_dir, progress_bar=download_bar)
             download_bar.update(100 - download_bar.n)
             download_bar.set_description("📥 Download complete")
         except Exception as e:
@@ -186,73 +257,39 @@ def main():
             print(f"\nFailed to download audio: {e}")
             sys.exit(1)
 
-        # Find BPM/Key via audio analysis and/or manual input
-        if manual_bpm or manual_key:
-            bpm, key, sources = manual_bpm, manual_key, ["Manually specified"]
-            camelot = None
-            metadata_bar.update(100)
-            metadata_bar.set_description("🎹 Using manual BPM/Key")
-        else:
-            bpm, key, camelot, sources = detect_track_metadata(title, wav_path, metadata_bar)
-            metadata_bar.update(100 - metadata_bar.n)
-            metadata_bar.set_description("🎹 Metadata complete")
+        # Metadata lookup (browser/Essentia) and Demucs (subprocess) are
+        # independent, so look up metadata in a worker while stems split here.
+        # Each bar is only touched by one thread and tqdm serializes redraws.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Find BPM/Key via audio analysis and/or manual input
+            if manual_bpm or manual_key:
+                bpm, key, sources = manual_bpm, manual_key, ["Manually specified"]
+                camelot = None
+                metadata_bar.update(100)
+                metadata_bar.set_description("🎹 Using manual BPM/Key")
+                metadata_future = None
+            else:
+                metadata_future = executor.submit(
+                    detect_track_metadata, title, audio_path, metadata_bar
+                )
+
+            # Split stems (outputs land next to the download in target_dir)
+            split_script = os.path.join(project_root, "split_stems.py")
+            if not os.path.isfile(split_script):
+                stems_bar.update(100)
+                stems_bar.set_description("✂️  Stem split skipped")
+            else:
+                split_stems_with_progress(audio_path, target_dir, stems_bar)
 
-        # Split stems (run split_stems.py with CWD=target_dir so outputs land next to wav)
-        split_script = os.path.join(project_root, "split_stems.py")
-        if not os.path.isfile(split_script):
-            stems_bar.update(100)
-            stems_bar.set_description("✂️  Stem split skipped")
-        else:
-            try:
-                from ..audio.stem_splitter import split_audio_stems
-                stems_bar.set_description("✂️  Running Demucs...")
-                stems_bar.update(10)
-                
-                # Call stem splitter directly with progress bar
-                input_file = os.path.join(target_dir, os.path.basename(wav_path))
-                output_dir = os.path.join(target_dir, "demucs_output")
-                
-                import shutil
-                basename = os.path.splitext(os.path.basename(input_file))[0]
-                
-                # Clean up old output directory
-                if os.path.exists(output_dir):
-                    shutil.rmtree(output_dir)
-                os.makedirs(output_dir)
-                
-                stems_bar.update(10)
-                
-                # Run Demucs with quiet flag
-                from ..utils.subprocess_utils import run_command
-                cmd = ["demucs", "--two-stems", "vocals", "-o", output_dir, input_file]
-                
-                # Suppress output by redirecting to devnull
-                import subprocess
-                stems_bar.update(10)
-                stems_bar.set_description("✂️  Separating audio...")
-                subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-                stems_bar.update(50)
-                
-                # Locate and copy output files
-                stem_folder = os.path.join(output_dir, "htdemucs", basename)
-                vocals_path = os.path.join(stem_folder, "vocals.wav")
-                instrumental_path = os.path.join(stem_folder, "no_vocals.wav")
-                
-                out_vocals = os.path.join(target_dir, f"{basename}_vocals.wav")
-                out_instrumental = os.path.join(target_dir, f"{basename}_instrumental.wav")
-                
-                shutil.copyfile(vocals_path, out_vocals)
-                shutil.copyfile(instrumental_path, out_instrumental)
-                stems_bar.update(20)
-                stems_bar.set_description("✂️  Stems complete")
-                
-            except Exception as e:
-                stems_bar.set_description(f"✂️  Stem split failed")
+            if metadata_future:
+                bpm, key, camelot, sources = metadata_future.result()
+                metadata_bar.update(100 - metadata_bar.n)
+                metadata_bar.set_description("🎹 Metadata complete")
 
     # Write markdown summary
     md_path = os.path.join(target_dir, f"{safe_title}.md")
     write_track_info_markdown(
-        md_path, title, url, os.path.basename(wav_path),
+        md_path, title, url, os.path.basename(audio_path),
         bpm, key, camelot, sources
     )
 
@@ -1,9 +1,14 @@
 """YouTube download and processing modules."""
 
-from .youtube import download_youtube_audio, get_youtube_title
+from ..utils.lazy_import import lazy_exports
 
-__all__ = [
-    "download_youtube_audio",
-    "get_youtube_title",
-]
+# Submodules are imported on first attribute access (PEP 562), so importing
+# the package doesn't pull in the yt-dlp wrapper
+_LAZY_ATTRS = {
+    "download_youtube_audio": ".youtube",
+    "get_youtube_title": ".youtube",
+}
 
+__all__ = list(_LAZY_ATTRS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_ATTRS)
@@ -1,10 +1,12 @@
 """YouTube download functionality using yt-dlp."""
 
 import os
-import subprocess
 from typing import Optional
 from ..utils.subprocess_utils import run_command, run_command_capture
 
+# Extensions yt-dlp may produce when keeping the original audio stream
+AUDIO_EXTENSIONS = (".aac", ".flac", ".m4a", ".mp3", ".ogg", ".opus", ".wav", ".webm")
+
 
 def get_youtube_title(url: str) -> str:
     """
@@ -32,7 +34,7 @@ def get_youtube_title(url: str) -> str:
 def download_youtube_audio(
     url: str,
     output_dir: str,
-    audio_format: str = "wav",
+    audio_format: str = "best",
     progress_bar = None
 ) -> str:
     """
@@ -41,7 +43,8 @@ def download_youtube_audio(
     Args:
         url: YouTube video URL
         output_dir: Directory to save the audio file
-        audio_format: Audio format (default: "wav")
+        audio_format: Audio format to convert to, or "best" to keep the
+            original stream without re-encoding (default: "best")
         progress_bar: Optional tqdm progress bar to update
         
     Returns:
@@ -66,42 +69,80 @@ def download_youtube_audio(
         progress_bar.set_description("📥 Downloading audio...")
         progress_bar.update(10)
     
-    # Suppress yt-dlp output
-    subprocess.run([
+    # yt-dlp prints the final file path once post-processing has moved it
+    result = run_command_capture([
         "yt-dlp",
         "--no-playlist",
         "--extract-audio",
         "--audio-format", audio_format,
         "--extractor-args", "youtube:player_client=android",
+        # Fetch DASH fragments in parallel and chunk progressive downloads
+        "--concurrent-fragments", "8",
+        "--http-chunk-size", "10M",
+        # Let ffmpeg use all cores and skip re-encoding an existing output
+        "--postprocessor-args", "ffmpeg:-threads 0",
+        "--no-post-overwrites",
         "-o", output_template,
+        "--print", "after_move:filepath",
         "--quiet",
         "--no-warnings",
         url
-    ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    ])
     
     if progress_bar:
         progress_bar.update(60)
-        progress_bar.set_description("📥 Converting to WAV...")
+        progress_bar.set_description("📥 Extracting audio...")
     
     # Locate the downloaded file
-    audio_files = [
-        f for f in os.listdir(output_dir)
-        if f.lower().endswith(f".{audio_format}")
-    ]
-    
-    if not audio_files:
-        raise FileNotFoundError(
-            f"No {audio_format.upper()} file found after download in {output_dir}"
-        )
-    
-    # Return the most recently modified file (in case multiple exist)
-    audio_files.sort(
-        key=lambda f: os.path.getmtime(os.path.join(output_dir, f)),
-        reverse=True
-    )
+    printed = result.stdout.strip().splitlines()
+    if printed and os.path.isfile(printed[-1]):
+        audio_path = printed[-1]
+    else:
+        # Older yt-dlp without after_move support
+        audio_path = _find_newest_audio_file(output_dir, audio_format)
     
     if progress_bar:
         progress_bar.update(20)
     
-    return os.path.join(output_dir, audio_files[0])
+    return audio_path
+
 
+def _find_newest_audio_file(output_dir: str, audio_format: str) -> str:
+    """
+    Find the most recently modified audio file in a directory.
+    
+    Args:
+        output_dir: Directory to search
+        audio_format: File extension to match (e.g., "wav"), or "best" to
+            match any audio extension
+        
+    Returns:
+        Path to the newest matching file
+        
+    Raises:
+        FileNotFoundError: If no matching file exists
+    """
+    if audio_format == "best":
+        suffixes = AUDIO_EXTENSIONS
+    else:
+        suffixes = (f".{audio_format}",)
+    newest_path = None
+    newest_mtime = None
+    
+    # Single pass; DirEntry.stat() avoids a separate path lookup per file
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith(suffixes):
+                continue
+            mtime = entry.stat().st_mtime
+            if newest_mtime is None or mtime > newest_mtime:
+                newest_path = entry.path
+                newest_mtime = mtime
+    
+    if newest_path is None:
+        label = "audio" if audio_format == "best" else audio_format.upper()
+        raise FileNotFoundError(
+            f"No {label} file found after download in {output_dir}"
+        )
+    
+    return newest_path
@@ -1,9 +1,16 @@
 """Web scraping modules for music metadata."""
 
-from .tunebat import scrape_tunebat_info, is_tunebat_available
+from ..utils.lazy_import import lazy_exports
 
-__all__ = [
-    "scrape_tunebat_info",
-    "is_tunebat_available",
-]
+# Submodules are imported on first attribute access (PEP 562), so importing
+# the package doesn't pull in the scraper code
+_LAZY_ATTRS = {
+    "scrape_tunebat_info": ".tunebat",
+    "scrape_tunebat_info_batch": ".tunebat",
+    "scrape_tunebat_info_many": ".tunebat",
+    "is_tunebat_available": ".tunebat",
+}
 
+__all__ = list(_LAZY_ATTRS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_ATTRS)
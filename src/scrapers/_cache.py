@@ -0,0 +1,143 @@
+"""On-disk cache of TuneBat lookups."""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import List, Optional, Tuple
+from ..utils.file_utils import get_cache_dir
+
+_CACHE_FILENAME = "tunebat.sqlite3"
+_COOKIES_FILENAME = "tunebat-cookies.json"
+
+# One connection shared by all threads; sqlite3 objects aren't safe for
+# concurrent use, so every access holds the lock
+_connection = None
+_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the cache database on first use, creating the table if needed."""
+    global _connection
+    if _connection is None:
+        path = os.path.join(get_cache_dir(), _CACHE_FILENAME)
+        connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS tunebat ("
+            "title TEXT PRIMARY KEY, bpm TEXT, musical_key TEXT, camelot TEXT, ts INTEGER)"
+        )
+        _connection = connection
+    return _connection
+
+
+def cache_key(track_title: str) -> str:
+    """
+    Normalize a track title so case and spacing differences share an entry.
+    
+    Punctuation is kept: titles like "AC/DC - X" and "ACDC - X" can be
+    different tracks.
+    """
+    return " ".join(track_title.casefold().split())
+
+
+def load_cached_info(
+    track_title: str,
+    max_age: Optional[float] = None
+) -> Optional[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """
+    Look up a previously scraped track.
+    
+    Args:
+        track_title: Title of the track
+        max_age: Ignore entries older than this many seconds; None to accept
+            any age
+        
+    Returns:
+        Tuple of (bpm, key, camelot), or None if not cached
+    """
+    try:
+        with _lock:
+            row = _connect().execute(
+                "SELECT bpm, musical_key, camelot, ts FROM tunebat WHERE title = ?",
+                (cache_key(track_title),)
+            ).fetchone()
+    except (sqlite3.Error, OSError):
+        return None
+    
+    if row is None:
+        return None
+    if max_age is not None and time.time() - row[3] > max_age:
+        return None
+    return row[0], row[1], row[2]
+
+
+def store_cached_info(
+    track_title: str,
+    bpm: Optional[str],
+    key: Optional[str],
+    camelot: Optional[str]
+) -> None:
+    """Save a scraped result, replacing any older entry for the track."""
+    try:
+        with _lock:
+            _connect().execute(
+                "INSERT OR REPLACE INTO tunebat (title, bpm, musical_key, camelot, ts) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (cache_key(track_title), bpm, key, camelot, int(time.time()))
+            )
+    except (sqlite3.Error, OSError):
+        # Caching is best-effort
+        pass
+
+
+def load_cookies() -> List[dict]:
+    """
+    Load browser cookies saved by an earlier run.
+    
+    Returns:
+        Cookies as Selenium cookie dicts, or an empty list if none were saved
+    """
+    path = os.path.join(get_cache_dir(), _COOKIES_FILENAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            cookies = json.load(f)
+    except (OSError, ValueError):
+        return []
+    
+    if not isinstance(cookies, list):
+        return []
+    return [c for c in cookies if isinstance(c, dict) and "name" in c and "value" in c]
+
+
+def store_cookies(cookies: List[dict]) -> None:
+    """
+    Save browser cookies for later runs.
+    
+    The file is replaced atomically so a concurrent reader never sees a
+    partial write, and is only readable by the current user since the
+    cookies grant access to the site.
+    """
+    try:
+        cache_dir = get_cache_dir()
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".cookies-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(cookies, f)
+            os.replace(tmp_path, os.path.join(cache_dir, _COOKIES_FILENAME))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError):
+        # Caching is best-effort
+        pass
+
+
+def close() -> None:
+    """Close the cache database; it is reopened on next use."""
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
@@ -1,87 +1,595 @@
 """TuneBat web scraping for BPM and key information."""
 
+import asyncio
+import atexit
+import functools
+import logging
+import math
 import os
-import time
+import queue
+import threading
 import tempfile
 import shutil
-from typing import Optional, Tuple
-from urllib.parse import quote
+import time
+import urllib.request
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
+from urllib.parse import quote, urljoin
+from ..utils.lazy_import import LazyImportTester
+from ._cache import load_cached_info, load_cookies, store_cached_info, store_cookies
+
+logger = logging.getLogger(__name__)
 
 # Suppress Selenium/ChromeDriver logging
 os.environ['WDM_LOG_LEVEL'] = '0'
 
-# Check if Selenium is available
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    TUNEBAT_AVAILABLE = True
-except ImportError:
-    TUNEBAT_AVAILABLE = False
+# Selenium is imported on first scrape; this only checks that it is installed
+TUNEBAT_AVAILABLE = LazyImportTester("selenium")
+
+# Optional fast path: fetch pages over plain HTTP and parse them with lxml,
+# only starting a browser when Cloudflare blocks the request
+LXML_AVAILABLE = LazyImportTester("lxml")
+
+TUNEBAT_URL = "https://tunebat.com"
+HTTP_TIMEOUT = 10
+
+# Chrome major version the scraper presents itself as
+CHROME_VERSION = 141
+
+# Cloudflare ties its clearance cookie to the user agent, so the HTTP fast
+# path has to send the same one as the browser, with a matching version
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    f"(KHTML, like Gecko) Chrome/{CHROME_VERSION}.0.0.0 Safari/537.36"
+)
+
+# Cloudflare cookies from the last successful browser scrape, by name, as
+# Selenium cookie dicts. They are replayed on HTTP requests and loaded into
+# new browsers, and saved to disk so later runs skip the challenge too.
+_cloudflare_cookies = {}
+_cookies_loaded = False
+_cookie_lock = threading.RLock()
+
+# Cached lookups older than this are scraped again, so a wrong result
+# doesn't stick forever (30 days)
+CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+# Warm browsers kept for reuse between scrapes, and how many pages a browser
+# serves before it is replaced to bound its memory use
+DRIVER_POOL_SIZE = 2
+DRIVER_MAX_USES = 20
 
+# Chrome profiles for this process's drivers, kept between scrapes
+PROFILE_ROOT = os.path.join(tempfile.gettempdir(), f"tunebat-profiles-{os.getpid()}")
 
+# Pages are polled until their content appears rather than waited on for a
+# fixed time; a Cloudflare challenge page gets longer to clear
+PAGE_TIMEOUT = 15
+CHALLENGE_TIMEOUT = 30
+POLL_FREQUENCY = 0.25
+CLOUDFLARE_TITLE = "Just a moment"
+
+# Environment variable with the minimum seconds between lookups sent to
+# TuneBat (unset or 0 disables throttling). Cached results aren't throttled.
+RATE_LIMIT_ENV = "SCRAPER_RATE_LIMIT_DELAY"
+_rate_limit_lock = threading.Lock()
+_last_request_time = None
+
+# Returned by the challenge check so it can't be mistaken for page content
+_CHALLENGE = object()
+
+# URL of the first search result, or null until results have rendered
+_FIRST_RESULT_URL_JS = """
+const link = document.querySelector("a[href*='/Info/']");
+return link ? link.href : null;
+"""
+
+# Each info container holds a label (secondary span) and its value (h3)
+_EXTRACT_TRACK_INFO_JS = """
+const info = {bpm: null, key: null, camelot: null};
+for (const container of document.querySelectorAll('div.yIPfN')) {
+    const labelElement = container.querySelector('span.ant-typography-secondary');
+    const valueElement = container.querySelector('h3.ant-typography');
+    if (!labelElement || !valueElement) continue;
+    const label = labelElement.textContent.trim().toLowerCase();
+    const value = valueElement.textContent.trim();
+    if (label.includes('bpm')) info.bpm = value;
+    else if (label.includes('key')) info.key = value;
+    else if (label.includes('camelot')) info.camelot = value;
+}
+return info;
+"""
+
+
+@functools.lru_cache(maxsize=1)
 def is_tunebat_available() -> bool:
     """Check if TuneBat scraping dependencies are available."""
-    return TUNEBAT_AVAILABLE
+    return bool(TUNEBAT_AVAILABLE)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_rate_limit_delay(value: str) -> float:
+    """
+    Parse a rate limit delay setting, warning once per bad value.
+    
+    Args:
+        value: Setting as written, e.g. "6" or "0.5"
+        
+    Returns:
+        Delay in seconds, or 0 if the value isn't a non-negative number
+    """
+    try:
+        delay = float(value)
+    except ValueError:
+        delay = None
+    if delay is None or not math.isfinite(delay) or delay < 0:
+        logger.warning("Ignoring %s=%r: expected a number of seconds >= 0", RATE_LIMIT_ENV, value)
+        return 0.0
+    return delay
+
+
+def _rate_limit_delay() -> float:
+    """Return the configured delay between TuneBat lookups in seconds."""
+    value = os.environ.get(RATE_LIMIT_ENV, "").strip()
+    return _parse_rate_limit_delay(value) if value else 0.0
+
+
+def _wait_for_rate_limit() -> None:
+    """Sleep until the configured delay has passed since the last lookup."""
+    global _last_request_time
+    delay = _rate_limit_delay()
+    if delay <= 0:
+        return
+    
+    # Held while sleeping so concurrent scrapes queue up behind each other
+    with _rate_limit_lock:
+        now = time.monotonic()
+        if _last_request_time is not None:
+            wait = _last_request_time + delay - now
+            if wait > 0:
+                time.sleep(wait)
+                now += wait
+        _last_request_time = now
 
 
 def _extract_track_info(driver) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
     Extract BPM, key, and Camelot from TuneBat page.
     
+    The page is read in a single script call rather than one WebDriver round
+    trip per element.
+    
     Args:
         driver: Selenium WebDriver instance
         
     Returns:
         Tuple of (bpm, key, camelot)
     """
-    bpm = None
-    key = None
-    camelot = None
+    try:
+        info = driver.execute_script(_EXTRACT_TRACK_INFO_JS) or {}
+    except:
+        return None, None, None
+    
+    return info.get("bpm"), info.get("key"), info.get("camelot")
+
+
+@functools.lru_cache(maxsize=1)
+def _compiled_xpaths() -> dict:
+    """Compile the XPath expressions used by the HTTP fast path once."""
+    from lxml import etree
+    
+    return {
+        "result_link": etree.XPath("//a[contains(@href, '/Info/')]/@href"),
+        "containers": etree.XPath(
+            "//div[contains(concat(' ', normalize-space(@class), ' '), ' yIPfN ')]"
+        ),
+        "label": etree.XPath("string(.//span[contains(@class, 'ant-typography-secondary')])"),
+        "value": etree.XPath("string(.//h3[contains(@class, 'ant-typography')])"),
+    }
+
+
+def _fetch_page(url: str) -> Optional[str]:
+    """
+    Fetch a TuneBat page over plain HTTP.
+    
+    Returns:
+        Page HTML, or None if the request failed or hit a Cloudflare challenge
+    """
+    headers = {"User-Agent": USER_AGENT, "Accept": "text/html"}
+    cookies = _saved_cloudflare_cookies()
+    if cookies:
+        headers["Cookie"] = "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+    
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+            html = response.read().decode("utf-8", errors="replace")
+    except (OSError, ValueError):
+        return None
+    
+    if CLOUDFLARE_TITLE in html:
+        return None
+    return html
+
+
+def _try_http_scrape(
+    track_title: str,
+) -> Optional[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """
+    Look up a track without a browser.
+    
+    Returns:
+        Tuple of (bpm, key, camelot), or None if the browser is needed
+    """
+    if not LXML_AVAILABLE:
+        return None
     
+    from lxml import html as lxml_html
+    
+    xpaths = _compiled_xpaths()
+    
+    search_html = _fetch_page(f"{TUNEBAT_URL}/Search?q={quote(track_title)}")
+    if not search_html:
+        return None
+    links = xpaths["result_link"](lxml_html.fromstring(search_html))
+    if not links:
+        return None
+    
+    info_html = _fetch_page(urljoin(TUNEBAT_URL, links[0]))
+    if not info_html:
+        return None
+    
+    info = {}
+    for container in xpaths["containers"](lxml_html.fromstring(info_html)):
+        label = xpaths["label"](container).strip().lower()
+        value = xpaths["value"](container).strip()
+        if not label or not value:
+            continue
+        if 'bpm' in label:
+            info["bpm"] = value
+        elif 'key' in label:
+            info["key"] = value
+        elif 'camelot' in label:
+            info["camelot"] = value
+    
+    # Pages rendered client-side have no values in the HTML
+    if not info.get("bpm") and not info.get("key"):
+        return None
+    return info.get("bpm"), info.get("key"), info.get("camelot")
+
+
+def _saved_cloudflare_cookies() -> List[dict]:
+    """
+    Return the unexpired Cloudflare cookies, loading earlier runs' on first use.
+    """
+    global _cookies_loaded
+    now = time.time()
+    with _cookie_lock:
+        if not _cookies_loaded:
+            _cookies_loaded = True
+            for cookie in load_cookies():
+                _cloudflare_cookies.setdefault(cookie["name"], cookie)
+        
+        for name, cookie in list(_cloudflare_cookies.items()):
+            expiry = cookie.get("expiry")
+            if isinstance(expiry, (int, float)) and expiry <= now:
+                del _cloudflare_cookies[name]
+        return list(_cloudflare_cookies.values())
+
+
+def _remember_cloudflare_cookies(driver) -> None:
+    """Keep the browser's Cloudflare cookies for later requests and runs."""
     try:
-        # Find all info containers
-        info_containers = driver.find_elements(By.CSS_SELECTOR, 'div.yIPfN')
+        cookies = driver.get_cookies()
+    except Exception:
+        return
+    
+    cf_cookies = [
+        cookie for cookie in cookies
+        if cookie.get("name", "").startswith(("cf_", "__cf"))
+    ]
+    if not cf_cookies:
+        return
+    
+    with _cookie_lock:
+        known = _saved_cloudflare_cookies()
+        for cookie in cf_cookies:
+            _cloudflare_cookies[cookie["name"]] = cookie
+        if _cloudflare_cookies != {c["name"]: c for c in known}:
+            store_cookies(list(_cloudflare_cookies.values()))
+
+
+def _restore_cloudflare_cookies(driver) -> None:
+    """
+    Load saved Cloudflare cookies into a new browser.
+    
+    Uses the DevTools protocol, which unlike add_cookie() doesn't need the
+    browser to be on the cookie's domain first, so no extra page is loaded.
+    """
+    for cookie in _saved_cloudflare_cookies():
+        params = {
+            "name": cookie["name"],
+            "value": cookie["value"],
+            "domain": cookie.get("domain", ".tunebat.com"),
+            "path": cookie.get("path", "/"),
+            "secure": cookie.get("secure", True),
+            "httpOnly": cookie.get("httpOnly", False),
+        }
+        if "expiry" in cookie:
+            params["expires"] = cookie["expiry"]
+        if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+            params["sameSite"] = cookie["sameSite"]
+        try:
+            driver.execute_cdp_cmd("Network.setCookie", params)
+        except Exception:
+            # Without the cookie the browser just solves the challenge again
+            return
+
+
+@functools.lru_cache(maxsize=1)
+def _load_backend() -> SimpleNamespace:
+    """
+    Import the Selenium modules the scraper uses, on first use only.
+    
+    Modules rather than classes are kept so names are looked up when called
+    (and can be patched in tests).
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome import options as chrome_options
+    from selenium.webdriver.chrome import service as chrome_service
+    from selenium.webdriver.support import expected_conditions, ui
+    
+    return SimpleNamespace(
+        webdriver=webdriver,
+        chrome_options=chrome_options,
+        chrome_service=chrome_service,
+        expected_conditions=expected_conditions,
+        ui=ui
+    )
+
+
+def _wait_until(driver, content_loaded):
+    """
+    Wait for a page condition, allowing extra time for Cloudflare.
+    
+    Args:
+        driver: Selenium WebDriver instance
+        content_loaded: WebDriverWait condition that is truthy once the page
+            content has loaded
         
-        for container in info_containers:
+    Returns:
+        The condition's result
+        
+    Raises:
+        selenium.common.exceptions.TimeoutException: If the content doesn't load
+    """
+    selenium = _load_backend()
+    
+    def on_challenge_page(d):
+        return _CHALLENGE if CLOUDFLARE_TITLE in d.title else False
+    
+    result = selenium.ui.WebDriverWait(
+        driver, PAGE_TIMEOUT, poll_frequency=POLL_FREQUENCY
+    ).until(selenium.expected_conditions.any_of(on_challenge_page, content_loaded))
+    if result is _CHALLENGE:
+        result = selenium.ui.WebDriverWait(
+            driver, CHALLENGE_TIMEOUT, poll_frequency=POLL_FREQUENCY
+        ).until(content_loaded)
+    return result
+
+
+def _wait_for_result_url(driver) -> str:
+    """
+    Wait for the first search result and return its URL.
+    
+    The link lookup and its href are read by one script per poll instead of
+    a find_element round trip followed by get_attribute.
+    
+    Raises:
+        selenium.common.exceptions.TimeoutException: If no result appears
+    """
+    return _wait_until(driver, lambda d: d.execute_script(_FIRST_RESULT_URL_JS))
+
+
+def _wait_for_track_info(driver) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Wait until the info page has rendered its BPM or key and return the track info.
+    
+    Each poll is the extraction script itself, so the last poll's result is
+    the answer and the page isn't read again once it has loaded.
+    
+    Returns:
+        Tuple of (bpm, key, camelot)
+    
+    Raises:
+        selenium.common.exceptions.TimeoutException: If neither the BPM nor
+            the key appears
+    """
+    def track_info_loaded(d):
+        info = _extract_track_info(d)
+        return info if (info[0] or info[1]) else False
+    
+    return _wait_until(driver, track_info_loaded)
+
+
+def _create_driver(profile_dir: str):
+    """
+    Start a headless Chrome instance configured for scraping TuneBat.
+    
+    Args:
+        profile_dir: Chrome user data directory; reusing one keeps the disk
+            cache and Cloudflare clearance from earlier sessions
+        
+    Returns:
+        Selenium WebDriver instance
+    """
+    selenium = _load_backend()
+    
+    # Set up headless Chrome options
+    options = selenium.chrome_options.Options()
+    options.add_argument('--headless=new')  # Use new headless mode
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--log-level=3')  # Suppress Chrome logs
+    options.add_argument('--window-size=1920,1080')
+    
+    # Add a realistic user agent to avoid bot detection
+    options.add_argument(f'user-agent={USER_AGENT}')
+    
+    # Disable automation flags
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    
+    # Only the DOM text is read, so skip downloading images, fonts and
+    # plugins; stylesheets stay on since the page's class names come with them
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.managed_default_content_settings.plugins": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    
+    options.add_argument(f'--user-data-dir={profile_dir}')
+    
+    # Suppress logging
+    logging.getLogger('selenium').setLevel(logging.ERROR)
+    logging.getLogger('urllib3').setLevel(logging.ERROR)
+    
+    # Initialize ChromeDriver
+    service = selenium.chrome_service.Service()
+    driver = selenium.webdriver.Chrome(service=service, options=options)
+    _restore_cloudflare_cookies(driver)
+    return driver
+
+
+class _DriverPool:
+    """
+    Pool of warm Chrome instances shared by scrape calls.
+    
+    Starting Chrome dominates the cost of a scrape, so drivers are handed
+    back after use instead of quit. A driver is quit when the pool is full,
+    when it has served DRIVER_MAX_USES pages, or when a scrape failed with it.
+    
+    Each running driver has its own profile directory under profile_root
+    (Chrome locks a profile while it is open). Profiles outlive their
+    drivers and are handed to replacements, and the whole root is removed
+    at shutdown.
+    """
+    
+    def __init__(
+        self,
+        size: int = DRIVER_POOL_SIZE,
+        max_uses: int = DRIVER_MAX_USES,
+        profile_root: str = PROFILE_ROOT
+    ):
+        self.max_uses = max_uses
+        self.profile_root = profile_root
+        self._idle = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._free_profiles = []
+        self._profile_count = 0
+        self._uses = {}
+    
+    def get(self):
+        """Return an idle driver, starting a new one if none is available."""
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            profile_dir = self._acquire_profile()
             try:
-                # Get the label (in span with ant-typography-secondary class)
-                label_element = container.find_element(By.CSS_SELECTOR, 'span.ant-typography-secondary')
-                label = label_element.text.strip().lower()
-                
-                # Get the value (in h3 with ant-typography class)
-                value_element = container.find_element(By.CSS_SELECTOR, 'h3.ant-typography')
-                value = value_element.text.strip()
-                
-                if 'bpm' in label:
-                    bpm = value
-                elif 'key' in label:
-                    key = value
-                elif 'camelot' in label:
-                    camelot = value
-            except:
-                continue
-    except:
-        pass
+                driver = _create_driver(profile_dir)
+            except BaseException:
+                with self._lock:
+                    self._free_profiles.append(profile_dir)
+                raise
+            with self._lock:
+                self._profiles[driver] = profile_dir
+                self._uses[driver] = 0
+        
+        with self._lock:
+            self._uses[driver] += 1
+        return driver
+    
+    def release(self, driver) -> None:
+        """Return a driver to the pool for reuse."""
+        with self._lock:
+            worn_out = self._uses.get(driver, 0) >= self.max_uses
+        if worn_out:
+            self.discard(driver)
+            return
+        
+        # Cookies are kept: Cloudflare clearance is what makes reuse fast
+        try:
+            driver.get("about:blank")
+            self._idle.put_nowait(driver)
+        except queue.Full:
+            self.discard(driver)
+        except Exception:
+            # Browser is no longer usable
+            self.discard(driver)
     
-    return bpm, key, camelot
+    def discard(self, driver) -> None:
+        """Quit a driver, keeping its profile for the next driver."""
+        with self._lock:
+            profile_dir = self._profiles.pop(driver, None)
+            self._uses.pop(driver, None)
+        
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        
+        if profile_dir:
+            with self._lock:
+                self._free_profiles.append(profile_dir)
+    
+    def shutdown(self) -> None:
+        """Quit all idle drivers and remove the profile directories."""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(driver)
+        
+        shutil.rmtree(self.profile_root, ignore_errors=True)
+    
+    def _acquire_profile(self) -> str:
+        """Return a profile directory no running driver is using."""
+        with self._lock:
+            if self._free_profiles:
+                return self._free_profiles.pop()
+            self._profile_count += 1
+            return os.path.join(self.profile_root, f"profile-{self._profile_count}")
+
+
+_DRIVER_POOL = _DriverPool()
+atexit.register(_DRIVER_POOL.shutdown)
 
 
 def scrape_tunebat_info(
     track_title: str,
-    chrome_version: int = 141,
-    silent: bool = False
+    chrome_version: int = CHROME_VERSION,
+    silent: bool = False,
+    driver=None,
+    cache_max_age: Optional[float] = CACHE_MAX_AGE
 ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
     Scrape TuneBat for BPM and key information.
     
     Args:
         track_title: Title of the track to search for
-        chrome_version: Chrome driver version to use (kept for API compatibility, not used)
+        chrome_version: Kept for API compatibility, not used; the browser and
+            HTTP requests always present themselves as CHROME_VERSION
         silent: If True, suppress print statements
+        driver: Selenium WebDriver to scrape with instead of one from the
+            shared pool; the caller keeps ownership and must quit it
+        cache_max_age: Seconds a cached result stays valid (default 30 days);
+            None to accept cached results of any age
         
     Returns:
         Tuple of (bpm, key, camelot) where each can be None if not found
@@ -92,97 +600,118 @@ def scrape_tunebat_info(
     if not TUNEBAT_AVAILABLE:
         return None, None, None
     
-    driver = None
-    temp_dir = None
-    try:
+    # Results for a track don't change, so earlier runs' lookups are reused
+    cached = load_cached_info(track_title, max_age=cache_max_age)
+    if cached:
         if not silent:
-            print("Searching TuneBat for track information...")
-        
-        # Set up headless Chrome options
-        options = Options()
-        options.add_argument('--headless=new')  # Use new headless mode
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--log-level=3')  # Suppress Chrome logs
-        options.add_argument('--window-size=1920,1080')
-        
-        # Add a realistic user agent to avoid bot detection
-        options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        
-        # Disable automation flags
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        
-        # Use a unique temporary user data directory to avoid conflicts
-        temp_dir = tempfile.mkdtemp()
-        options.add_argument(f'--user-data-dir={temp_dir}')
-        
-        # Suppress logging
-        import logging
-        logging.getLogger('selenium').setLevel(logging.ERROR)
-        logging.getLogger('urllib3').setLevel(logging.ERROR)
-        
-        # Initialize ChromeDriver
-        service = Service()
-        driver = webdriver.Chrome(service=service, options=options)
+            logger.info("✓ Retrieved from TuneBat cache: BPM=%s, Key=%s, Camelot=%s", *cached)
+        return cached
+    
+    if not silent:
+        logger.info("Searching TuneBat for track information...")
+    
+    _wait_for_rate_limit()
+    result = _try_http_scrape(track_title)
+    if result:
+        store_cached_info(track_title, *result)
+        if not silent:
+            logger.info("✓ Retrieved from TuneBat: BPM=%s, Key=%s, Camelot=%s", *result)
+        return result
+    
+    pooled = driver is None
+    try:
+        if pooled:
+            driver = _DRIVER_POOL.get()
         
         # Search TuneBat
         search_query = quote(track_title)
-        search_url = f"https://tunebat.com/Search?q={search_query}"
+        search_url = f"{TUNEBAT_URL}/Search?q={search_query}"
         driver.get(search_url)
         
-        # Wait for Cloudflare and page to load
-        time.sleep(10)  # Give Cloudflare time to pass
-        wait = WebDriverWait(driver, 15)
-        
         # Find first search result link
         try:
-            first_result = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/Info/']"))
-            )
-            result_url = first_result.get_attribute('href')
+            result_url = _wait_for_result_url(driver)
             if not silent:
-                print(f"Found TuneBat page: {result_url}")
+                logger.info("Found TuneBat page: %s", result_url)
             
             # Navigate to song page
             driver.get(result_url)
-            time.sleep(10)  # Wait for page to load (including Cloudflare)
             
-            # Extract song information
-            bpm, key, camelot = _extract_track_info(driver)
+            # Extract song information once it has rendered
+            bpm, key, camelot = _wait_for_track_info(driver)
             
             if bpm or key:
+                _remember_cloudflare_cookies(driver)
+                store_cached_info(track_title, bpm, key, camelot)
                 if not silent:
-                    print(f"✓ Retrieved from TuneBat: BPM={bpm}, Key={key}, Camelot={camelot}")
+                    logger.info(
+                        "✓ Retrieved from TuneBat: BPM=%s, Key=%s, Camelot=%s", bpm, key, camelot
+                    )
                 return bpm, key, camelot
             else:
                 if not silent:
-                    print("Could not extract BPM/Key from TuneBat page")
+                    logger.info("Could not extract BPM/Key from TuneBat page")
                 return None, None, None
                 
         except Exception as e:
             if not silent:
-                print(f"Could not find song on TuneBat: {e}")
+                logger.info("Could not find song on TuneBat: %s", e)
             return None, None, None
     
     except Exception as e:
         if not silent:
-            print(f"TuneBat scraping failed: {e}")
+            logger.warning("TuneBat scraping failed: %s", e)
+        if pooled and driver:
+            # Don't hand a browser in an unknown state to the next scrape
+            _DRIVER_POOL.discard(driver)
+            driver = None
         return None, None, None
     
     finally:
-        if driver:
-            try:
-                driver.quit()
-            except:
-                pass
+        if pooled and driver:
+            _DRIVER_POOL.release(driver)
+
+
+async def scrape_tunebat_info_batch(
+    track_titles: List[str],
+    max_concurrency: int = DRIVER_POOL_SIZE,
+    silent: bool = True
+) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """
+    Scrape TuneBat for several tracks concurrently.
+    
+    Each title is scraped by scrape_tunebat_info in a worker thread, with at
+    most max_concurrency browsers working at once, so most of the fixed page
+    waits overlap instead of adding up.
+    
+    Args:
+        track_titles: Titles of the tracks to search for
+        max_concurrency: Maximum number of concurrent scrapes (default: pool size)
+        silent: If True, suppress progress messages
         
-        # Clean up temporary user data directory
-        if temp_dir and os.path.exists(temp_dir):
-            try:
-                shutil.rmtree(temp_dir)
-            except:
-                pass
+    Returns:
+        List of (bpm, key, camelot) tuples in the same order as track_titles
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def scrape_one(title: str):
+        async with semaphore:
+            return await asyncio.to_thread(scrape_tunebat_info, title, silent=silent)
+    
+    return list(await asyncio.gather(*(scrape_one(title) for title in track_titles)))
+
 
+def scrape_tunebat_info_many(
+    track_titles: List[str],
+    max_concurrency: int = DRIVER_POOL_SIZE,
+    silent: bool = True
+) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """
+    Synchronous wrapper around scrape_tunebat_info_batch.
+    
+    Must not be called from a running event loop; await
+    scrape_tunebat_info_batch there instead.
+    """
+    return asyncio.run(
+        scrape_tunebat_info_batch(track_titles, max_concurrency=max_concurrency, silent=silent)
+    )
@@ -2,12 +2,18 @@
 
 from .subprocess_utils import run_command, run_command_capture
 from .sanitization import sanitize_filename
-from .file_utils import ensure_dependency
+from .file_utils import ensure_dependency, get_cache_dir, move_file
+from .lazy_import import LazyImportTester, lazy_exports, module_available
 
 __all__ = [
     "run_command",
     "run_command_capture",
     "sanitize_filename",
     "ensure_dependency",
+    "get_cache_dir",
+    "move_file",
+    "LazyImportTester",
+    "lazy_exports",
+    "module_available",
 ]
 
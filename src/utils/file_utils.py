@@ -1,22 +1,70 @@
 """File and dependency management utilities."""
 
+import errno
+import os
+import shutil
 import sys
-from .subprocess_utils import run_command_capture
+
+# Dependencies already found in this process; a missing one exits instead
+_CHECKED_DEPENDENCIES = set()
 
 
 def ensure_dependency(dep: str) -> None:
     """
     Check if a system dependency is available in PATH.
     
+    Only searches PATH (shutil.which); the tool itself is not run.
+    
     Args:
         dep: Name of the dependency (e.g., 'yt-dlp', 'ffmpeg')
         
     Raises:
         SystemExit: If dependency is not found
     """
-    try:
-        run_command_capture([dep, "--version"])
-    except Exception:
+    if dep in _CHECKED_DEPENDENCIES:
+        return
+    
+    if shutil.which(dep) is None:
         print(f"Error: required dependency '{dep}' not found in PATH.")
         sys.exit(1)
+    
+    _CHECKED_DEPENDENCIES.add(dep)
+
+
+def get_cache_dir() -> str:
+    """
+    Get the per-user cache directory for this toolkit, creating it if needed.
+    
+    Honors XDG_CACHE_HOME and defaults to ~/.cache/stems.
+    
+    Returns:
+        Path to the cache directory
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    cache_dir = os.path.join(base, "stems")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
 
+def move_file(src: str, dst: str) -> None:
+    """
+    Move a file, replacing the destination if it exists.
+    
+    Uses a rename when source and destination are on the same filesystem,
+    so no file data is copied. Falls back to copy-and-delete across
+    filesystems.
+    
+    Args:
+        src: Path of the file to move
+        dst: Destination path
+        
+    Raises:
+        OSError: If the file cannot be moved
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.copyfile(src, dst)
+        os.remove(src)
@@ -0,0 +1,85 @@
+"""Lazy availability checks for optional dependencies."""
+
+import functools
+import importlib
+import importlib.util
+import sys
+from typing import Callable, Dict, List, Tuple
+
+
+@functools.lru_cache(maxsize=None)
+def module_available(name: str) -> bool:
+    """
+    Check whether a module can be imported without importing it.
+
+    Uses importlib.util.find_spec, which only searches sys.path. The result is
+    cached so repeated checks for a missing module don't re-scan the path.
+
+    Args:
+        name: Importable module name (e.g., 'essentia')
+
+    Returns:
+        True if the module can be found, False otherwise
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyImportTester:
+    """
+    Boolean stand-in for an optional dependency flag.
+
+    Evaluates to True when all named modules are importable. Nothing is
+    imported until the caller actually needs the module.
+
+    Example:
+        >>> HAS_FOO = LazyImportTester("foo")
+        >>> if HAS_FOO:
+        ...     import foo
+    """
+
+    def __init__(self, *names: str):
+        self.names = names
+
+    def __bool__(self) -> bool:
+        return all(module_available(name) for name in self.names)
+
+    def __repr__(self) -> str:
+        return f"LazyImportTester({', '.join(repr(n) for n in self.names)})"
+
+
+def lazy_exports(
+    package: str,
+    exports: Dict[str, str]
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Build a package's module-level __getattr__ and __dir__ (PEP 562).
+
+    Each exported name is imported from its submodule on first access and
+    then stored on the package, so importing the package alone doesn't pull
+    in the submodules.
+
+    Example:
+        >>> __getattr__, __dir__ = lazy_exports(__name__, {"foo": ".bar"})
+
+    Args:
+        package: The package's __name__
+        exports: Maps each exported name to the relative submodule defining it
+
+    Returns:
+        Tuple of (__getattr__, __dir__) functions to assign in the package
+    """
+    def __getattr__(name: str) -> object:
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(submodule, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
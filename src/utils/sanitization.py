@@ -2,6 +2,36 @@
 
 import re
 
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+
+# Punctuation kept in filenames besides word characters
+_SAFE_PUNCTUATION = "_- ()"
+
+
+class _FilenameTable(dict):
+    """
+    str.translate table that keeps filename-safe characters.
+    
+    Word characters (str.isalnum(), the same set as regex \\w) and
+    _SAFE_PUNCTUATION map to themselves and everything else is deleted.
+    Entries are filled in on first lookup, since a full table would cover
+    every Unicode code point.
+    """
+    
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        result = char if char.isalnum() or char in _SAFE_PUNCTUATION else None
+        self[codepoint] = result
+        return result
+
+
+_FILENAME_TABLE = _FilenameTable()
+
+# ASCII characters dropped from filenames, for the bytes.translate fast path
+_ASCII_UNSAFE = bytes(
+    c for c in range(128) if not (chr(c).isalnum() or chr(c) in _SAFE_PUNCTUATION)
+)
+
 
 def sanitize_filename(name: str) -> str:
     """
@@ -20,14 +50,15 @@ def sanitize_filename(name: str) -> str:
         >>> sanitize_filename("Song Title  (feat. Artist)")
         'Song Title (feat Artist)'
     """
-    # Collapse multiple whitespace
-    name = re.sub(r"\s+", " ", name).strip()
-    
-    # Remove special characters except word chars, dash, space, parens
-    name = re.sub(r"[^\w\- ()]", "", name)
-    
-    # Normalize spaces again
-    name = re.sub(r"\s", " ", name).strip()
+    # Collapse multiple whitespace, then drop unsafe characters in one
+    # translate pass; removed characters leave their surrounding spaces
+    name = _WHITESPACE_RUN_RE.sub(" ", name)
+    if name.isascii():
+        # Most titles are ASCII, where bytes.translate deletes characters
+        # without a table lookup per character
+        name = name.encode("ascii").translate(None, _ASCII_UNSAFE).decode("ascii")
+    else:
+        name = name.translate(_FILENAME_TABLE)
+    name = name.strip()
     
     return name or "yt_download"
-
@@ -21,12 +21,14 @@ def run_command(cmd: List[str], cwd: Optional[str] = None) -> subprocess.Complet
     return subprocess.run(cmd, cwd=cwd, check=True)
 
 
-def run_command_capture(cmd: List[str]) -> subprocess.CompletedProcess:
+def run_command_capture(cmd: List[str], text: bool = True) -> subprocess.CompletedProcess:
     """
     Run a command and capture output.
     
     Args:
         cmd: Command and arguments as a list
+        text: Decode output as UTF-8 (default). Pass False to get raw bytes
+            and skip decoding output the caller doesn't read
         
     Returns:
         CompletedProcess instance with stdout and stderr captured
@@ -34,11 +36,22 @@ def run_command_capture(cmd: List[str]) -> subprocess.CompletedProcess:
     Raises:
         subprocess.CalledProcessError: If command fails
     """
+    if not text:
+        return subprocess.run(
+            cmd,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+    
+    # An explicit encoding skips the locale lookup, and stray bytes in
+    # tool output don't abort the call
     return subprocess.run(
         cmd,
         check=True,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True
+        encoding="utf-8",
+        errors="replace"
     )
 
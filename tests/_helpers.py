@@ -0,0 +1,69 @@
+"""Helpers shared by the unit tests."""
+
+import subprocess
+from typing import Dict, List, Tuple
+
+
+def argv_flag(cmd: List[str], flag: str) -> str:
+    """
+    Return the value following a flag in a command's argument list.
+    
+    Args:
+        cmd: Command as a list of arguments
+        flag: Flag to look up, e.g. "--audio-format"
+        
+    Returns:
+        The argument right after the flag
+        
+    Raises:
+        ValueError: If the flag isn't in the command
+    """
+    return cmd[cmd.index(flag) + 1]
+
+
+class FakeCommandRunner:
+    """
+    Stand-in for run_command_capture that replays canned command output.
+    
+    Tests register output for an argv prefix with expect(); each call is
+    answered by the longest registered prefix of its argv and recorded in
+    calls. Nonzero return codes raise CalledProcessError like the real
+    runner does.
+    """
+    
+    def __init__(self):
+        self._table: Dict[Tuple[str, ...], subprocess.CompletedProcess] = {}
+        self.calls: List[List[str]] = []
+    
+    def expect(self, argv: List[str], stdout: str = "", returncode: int = 0) -> None:
+        """
+        Register the result for commands starting with argv.
+        
+        Args:
+            argv: Argument prefix to match
+            stdout: Output the command prints
+            returncode: Exit status of the command
+        """
+        self._table[tuple(argv)] = subprocess.CompletedProcess(
+            list(argv), returncode, stdout=stdout, stderr=""
+        )
+    
+    def reset(self) -> None:
+        """Forget registered results and recorded calls."""
+        self._table.clear()
+        self.calls.clear()
+    
+    def __call__(self, cmd: List[str], text: bool = True) -> subprocess.CompletedProcess:
+        self.calls.append(list(cmd))
+        for end in range(len(cmd), 0, -1):
+            result = self._table.get(tuple(cmd[:end]))
+            if result is not None:
+                break
+        else:
+            raise AssertionError(f"Unexpected command: {cmd}")
+        
+        if result.returncode:
+            raise subprocess.CalledProcessError(
+                result.returncode, cmd, output=result.stdout, stderr=result.stderr
+            )
+        return result
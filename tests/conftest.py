@@ -0,0 +1,16 @@
+"""pytest configuration: tag tests as unit or network-bound integration tests."""
+
+import pytest
+
+# Test classes that talk to YouTube/TuneBat over the network
+NETWORK_TEST_CLASSES = {"TestYouTubeIntegration"}
+
+
+def pytest_collection_modifyitems(config, items):
+    """Mark every collected test as either integration or unit."""
+    for item in items:
+        if item.cls is not None and item.cls.__name__ in NETWORK_TEST_CLASSES:
+            item.add_marker(pytest.mark.integration)
+        else:
+            item.add_marker(pytest.mark.unit)
+
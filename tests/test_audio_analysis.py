@@ -1,13 +1,42 @@
 """Unit tests for audio analysis module."""
 
+import os
+import shutil
+import tempfile
+import subprocess
+import sys
 import unittest
 from unittest.mock import patch, MagicMock
 from src.audio.analysis import (
     is_essentia_available,
     analyze_audio_bpm_key,
-    ESSENTIA_AVAILABLE
+    ESSENTIA_AVAILABLE,
+    _analysis_cache_key,
+    _load_cached_analysis,
+    _store_cached_analysis
 )
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _fake_pool(bpm: float, key: str, scale: str) -> dict:
+    """Build pool contents as streaming outputs store them."""
+    return {
+        "rhythm.bpm": [bpm],
+        "tonal.key": [key],
+        "tonal.scale": [scale],
+    }
+
+
+def _patch_native_rate(test: unittest.TestCase, rate: int) -> MagicMock:
+    """Patch MetadataReader so the file reports the given sample rate."""
+    patcher = patch('essentia.standard.MetadataReader')
+    mock_reader = patcher.start()
+    test.addCleanup(patcher.stop)
+    mock_reader.return_value.outputNames.return_value = ["duration", "sampleRate"]
+    mock_reader.return_value.return_value = (200.0, float(rate))
+    return mock_reader
+
 
 class TestAudioAnalysis(unittest.TestCase):
     """Test cases for audio analysis functions."""
@@ -16,33 +45,95 @@ class TestAudioAnalysis(unittest.TestCase):
         """Test checking if Essentia is available."""
         result = is_essentia_available()
         self.assertIsInstance(result, bool)
-        self.assertEqual(result, ESSENTIA_AVAILABLE)
+        self.assertEqual(result, bool(ESSENTIA_AVAILABLE))
+    
+    def test_is_essentia_available_does_not_import_essentia(self):
+        """Test that the availability check doesn't import Essentia."""
+        code = (
+            "import sys\n"
+            "from src.audio.analysis import is_essentia_available\n"
+            "is_essentia_available()\n"
+            "print('essentia' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_ROOT,
+            check=True,
+            stdout=subprocess.PIPE,
+            text=True
+        )
+        self.assertEqual(result.stdout.strip(), "False")
     
     @unittest.skipIf(not ESSENTIA_AVAILABLE, "Essentia not installed")
-    @patch('src.audio.analysis.es.MonoLoader')
-    @patch('src.audio.analysis.es.RhythmExtractor2013')
-    @patch('src.audio.analysis.es.KeyExtractor')
-    def test_analyze_audio_success(self, mock_key_extractor, mock_rhythm, mock_loader):
+    @patch('essentia.run')
+    @patch('essentia.Pool')
+    @patch('essentia.streaming.AudioLoader')
+    @patch('essentia.streaming.RhythmExtractor2013')
+    @patch('essentia.streaming.KeyExtractor')
+    def test_analyze_audio_success(
+        self, mock_key_extractor, mock_rhythm, mock_loader, mock_pool, mock_run
+    ):
         """Test successful audio analysis."""
-        # Mock audio data
-        mock_audio = MagicMock()
-        mock_loader.return_value.return_value = mock_audio
-        
-        # Mock rhythm extraction
-        mock_rhythm_instance = MagicMock()
-        mock_rhythm_instance.return_value = (128.5, [], 0.9, None, [])
-        mock_rhythm.return_value = mock_rhythm_instance
-        
-        # Mock key extraction
-        mock_key_instance = MagicMock()
-        mock_key_instance.return_value = ("A", "major", 0.8)
-        mock_key_extractor.return_value = mock_key_instance
+        _patch_native_rate(self, 44100)
+        mock_pool.return_value = _fake_pool(128.5, "A", "major")
         
         bpm, key, sources = analyze_audio_bpm_key("/path/to/test.wav")
         
         self.assertEqual(bpm, "128")
         self.assertEqual(key, "A Major")
         self.assertIn("Audio analysis (Essentia)", sources)
+        
+        # Both extractors run from a single pass of the loader
+        mock_run.assert_called_once_with(mock_loader.return_value)
+        
+        # Key detection runs on a downsampled signal
+        mock_key_extractor.assert_called_once_with(sampleRate=22050)
+    
+    @unittest.skipIf(not ESSENTIA_AVAILABLE, "Essentia not installed")
+    @patch('essentia.run')
+    @patch('essentia.Pool')
+    @patch('essentia.streaming.Resample')
+    @patch('essentia.streaming.AudioLoader')
+    @patch('essentia.streaming.RhythmExtractor2013')
+    @patch('essentia.streaming.KeyExtractor')
+    def test_analyze_audio_resamples_from_native_rate(
+        self, mock_key_extractor, mock_rhythm, mock_loader, mock_resample, mock_pool, mock_run
+    ):
+        """Test that each branch resamples only when its rate differs."""
+        mock_pool.return_value = _fake_pool(128.0, "A", "minor")
+        
+        # 44.1 kHz source: only the key branch needs resampling
+        _patch_native_rate(self, 44100)
+        analyze_audio_bpm_key("/path/to/test.wav")
+        mock_resample.assert_called_once_with(inputSampleRate=44100, outputSampleRate=22050)
+        
+        # 48 kHz source: both branches resample directly from 48 kHz
+        mock_resample.reset_mock()
+        _patch_native_rate(self, 48000)
+        analyze_audio_bpm_key("/path/to/test.wav")
+        mock_resample.assert_any_call(inputSampleRate=48000, outputSampleRate=44100)
+        mock_resample.assert_any_call(inputSampleRate=48000, outputSampleRate=22050)
+    
+    @unittest.skipIf(not ESSENTIA_AVAILABLE, "Essentia not installed")
+    @patch('essentia.run')
+    @patch('essentia.Pool')
+    @patch('essentia.streaming.Trimmer')
+    @patch('essentia.streaming.AudioLoader')
+    @patch('essentia.streaming.RhythmExtractor2013')
+    @patch('essentia.streaming.KeyExtractor')
+    def test_analyze_audio_max_duration(
+        self, mock_key_extractor, mock_rhythm, mock_loader, mock_trimmer, mock_pool, mock_run
+    ):
+        """Test that analysis is limited to max_duration seconds."""
+        _patch_native_rate(self, 44100)
+        mock_pool.return_value = _fake_pool(128.0, "A", "minor")
+        
+        analyze_audio_bpm_key("/path/to/test.wav", max_duration=60)
+        mock_trimmer.assert_called_once_with(sampleRate=44100, endTime=60)
+        
+        mock_trimmer.reset_mock()
+        analyze_audio_bpm_key("/path/to/test.wav", max_duration=None)
+        mock_trimmer.assert_not_called()
     
     @unittest.skipIf(ESSENTIA_AVAILABLE, "Test for when Essentia is not available")
     def test_analyze_audio_no_essentia(self):
@@ -54,10 +145,10 @@ class TestAudioAnalysis(unittest.TestCase):
         self.assertEqual(sources, [])
     
     @unittest.skipIf(not ESSENTIA_AVAILABLE, "Essentia not installed")
-    @patch('src.audio.analysis.es.MonoLoader')
-    def test_analyze_audio_file_not_found(self, mock_loader):
+    @patch('essentia.standard.MetadataReader')
+    def test_analyze_audio_file_not_found(self, mock_reader):
         """Test analysis with non-existent file."""
-        mock_loader.side_effect = Exception("File not found")
+        mock_reader.side_effect = Exception("File not found")
         
         bpm, key, sources = analyze_audio_bpm_key("/nonexistent/file.wav")
         
@@ -68,22 +159,96 @@ class TestAudioAnalysis(unittest.TestCase):
     @unittest.skipIf(not ESSENTIA_AVAILABLE, "Essentia not installed")
     def test_analyze_audio_custom_sample_rate(self):
         """Test analysis with custom sample rate."""
-        with patch('src.audio.analysis.es.MonoLoader') as mock_loader, \
-             patch('src.audio.analysis.es.RhythmExtractor2013') as mock_rhythm, \
-             patch('src.audio.analysis.es.KeyExtractor') as mock_key:
+        _patch_native_rate(self, 44100)
+        
+        with patch('essentia.streaming.AudioLoader') as mock_loader, \
+             patch('essentia.streaming.Resample') as mock_resample, \
+             patch('essentia.streaming.RhythmExtractor2013'), \
+             patch('essentia.streaming.KeyExtractor'), \
+             patch('essentia.Pool') as mock_pool, \
+             patch('essentia.run'):
             
-            mock_loader.return_value.return_value = MagicMock()
-            mock_rhythm.return_value.return_value = (120.0, [], 0.8, None, [])
-            mock_key.return_value.return_value = ("C", "minor", 0.7)
+            mock_pool.return_value = _fake_pool(120.0, "C", "minor")
             
             analyze_audio_bpm_key("/path/to/test.wav", sample_rate=48000)
             
-            mock_loader.assert_called_with(
-                filename="/path/to/test.wav",
-                sampleRate=48000
+            mock_loader.assert_called_with(filename="/path/to/test.wav")
+            mock_resample.assert_any_call(
+                inputSampleRate=44100,
+                outputSampleRate=48000
             )
 
 
+class TestAnalysisCache(unittest.TestCase):
+    """Test cases for the analysis result cache."""
+    
+    def setUp(self):
+        """Point the cache at a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.wav_path = os.path.join(self.temp_dir, "song.wav")
+        with open(self.wav_path, "wb") as f:
+            f.write(b"RIFF audio data")
+        
+        patcher = patch('src.audio.analysis.get_cache_dir', return_value=self.temp_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_cache_key_depends_on_content(self):
+        """Test that the key changes when the file content changes."""
+        key_before = _analysis_cache_key(self.wav_path, 44100, 180.0)
+        with open(self.wav_path, "ab") as f:
+            f.write(b" more")
+        key_after = _analysis_cache_key(self.wav_path, 44100, 180.0)
+        
+        self.assertIsNotNone(key_before)
+        self.assertNotEqual(key_before, key_after)
+    
+    def test_cache_key_depends_on_parameters(self):
+        """Test that analysis parameters are part of the key."""
+        self.assertNotEqual(
+            _analysis_cache_key(self.wav_path, 44100, 180.0),
+            _analysis_cache_key(self.wav_path, 44100, None)
+        )
+    
+    def test_cache_key_missing_file(self):
+        """Test that an unreadable file disables caching."""
+        self.assertIsNone(_analysis_cache_key("/nonexistent/file.wav", 44100, 180.0))
+    
+    def test_store_and_load(self):
+        """Test a stored result can be loaded back."""
+        key = _analysis_cache_key(self.wav_path, 44100, 180.0)
+        
+        self.assertIsNone(_load_cached_analysis(key))
+        _store_cached_analysis(key, "128", "A Minor")
+        
+        self.assertEqual(_load_cached_analysis(key), {"bpm": "128", "key": "A Minor"})
+    
+    def test_load_corrupt_cache(self):
+        """Test that a corrupt cache file is treated as empty."""
+        with open(os.path.join(self.temp_dir, "analysis.json"), "w") as f:
+            f.write("{not json")
+        
+        key = _analysis_cache_key(self.wav_path, 44100, 180.0)
+        self.assertIsNone(_load_cached_analysis(key))
+    
+    @unittest.skipIf(not ESSENTIA_AVAILABLE, "Essentia not installed")
+    @patch('essentia.run')
+    def test_analyze_audio_uses_cache(self, mock_run):
+        """Test that a cached result skips Essentia entirely."""
+        key = _analysis_cache_key(self.wav_path, 44100, 180.0)
+        _store_cached_analysis(key, "99", "G Major")
+        
+        bpm, key, sources = analyze_audio_bpm_key(self.wav_path)
+        
+        self.assertEqual((bpm, key), ("99", "G Major"))
+        self.assertIn("Audio analysis (Essentia)", sources)
+        mock_run.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -1,29 +1,39 @@
 """Unit tests for file utilities."""
 
+import errno
+import os
+import shutil
+import tempfile
 import unittest
 import sys
-from unittest.mock import patch, MagicMock
-from src.utils.file_utils import ensure_dependency
+from unittest.mock import patch
+from src.utils.file_utils import ensure_dependency, get_cache_dir, move_file
 
 
 class TestFileUtils(unittest.TestCase):
     """Test cases for file utility functions."""
     
-    @patch('src.utils.file_utils.run_command_capture')
-    def test_ensure_dependency_exists(self, mock_run):
+    def setUp(self):
+        """Forget dependencies found by earlier tests."""
+        patcher = patch('src.utils.file_utils._CHECKED_DEPENDENCIES', set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    @patch('src.utils.file_utils.shutil.which')
+    def test_ensure_dependency_exists(self, mock_which):
         """Test checking for existing dependency."""
-        mock_run.return_value = MagicMock(stdout="version 1.0")
+        mock_which.return_value = "/usr/local/bin/yt-dlp"
         
         # Should not raise exception
         ensure_dependency("yt-dlp")
         
-        mock_run.assert_called_once_with(["yt-dlp", "--version"])
+        mock_which.assert_called_once_with("yt-dlp")
     
-    @patch('src.utils.file_utils.run_command_capture')
+    @patch('src.utils.file_utils.shutil.which')
     @patch('builtins.print')
-    def test_ensure_dependency_missing(self, mock_print, mock_run):
+    def test_ensure_dependency_missing(self, mock_print, mock_which):
         """Test checking for missing dependency exits."""
-        mock_run.side_effect = Exception("Command not found")
+        mock_which.return_value = None
         
         with self.assertRaises(SystemExit) as cm:
             ensure_dependency("missing-tool")
@@ -33,15 +43,89 @@ class TestFileUtils(unittest.TestCase):
             "Error: required dependency 'missing-tool' not found in PATH."
         )
     
-    @patch('src.utils.file_utils.run_command_capture')
-    def test_ensure_dependency_multiple_checks(self, mock_run):
+    @patch('src.utils.file_utils.shutil.which')
+    def test_ensure_dependency_multiple_checks(self, mock_which):
         """Test checking multiple dependencies."""
-        mock_run.return_value = MagicMock(stdout="version")
+        mock_which.return_value = "/usr/bin/dep"
         
         ensure_dependency("dep1")
         ensure_dependency("dep2")
         
-        self.assertEqual(mock_run.call_count, 2)
+        self.assertEqual(mock_which.call_count, 2)
+    
+    @patch('src.utils.file_utils.shutil.which')
+    def test_ensure_dependency_cached(self, mock_which):
+        """Test that a found dependency is only checked once."""
+        mock_which.return_value = "/usr/local/bin/yt-dlp"
+        
+        ensure_dependency("yt-dlp")
+        ensure_dependency("yt-dlp")
+        
+        mock_which.assert_called_once_with("yt-dlp")
+    
+    def test_get_cache_dir_honors_xdg(self):
+        """Test that the cache directory lives under XDG_CACHE_HOME."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": temp_dir}):
+            cache_dir = get_cache_dir()
+        
+        self.assertEqual(cache_dir, os.path.join(temp_dir, "stems"))
+        self.assertTrue(os.path.isdir(cache_dir))
+
+
+class TestMoveFile(unittest.TestCase):
+    """Test cases for moving files."""
+    
+    def setUp(self):
+        """Set up a temporary directory with a source file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.temp_dir, "src.wav")
+        self.dst = os.path.join(self.temp_dir, "dst.wav")
+        with open(self.src, "wb") as f:
+            f.write(b"audio")
+    
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_move_file_same_filesystem(self):
+        """Test that the file is renamed into place."""
+        move_file(self.src, self.dst)
+        
+        self.assertFalse(os.path.exists(self.src))
+        with open(self.dst, "rb") as f:
+            self.assertEqual(f.read(), b"audio")
+    
+    def test_move_file_replaces_existing(self):
+        """Test that an existing destination is overwritten."""
+        with open(self.dst, "wb") as f:
+            f.write(b"old")
+        
+        move_file(self.src, self.dst)
+        
+        with open(self.dst, "rb") as f:
+            self.assertEqual(f.read(), b"audio")
+    
+    @patch('src.utils.file_utils.os.replace')
+    def test_move_file_cross_device_falls_back_to_copy(self, mock_replace):
+        """Test copy-and-delete when rename crosses filesystems."""
+        mock_replace.side_effect = OSError(errno.EXDEV, "Invalid cross-device link")
+        
+        move_file(self.src, self.dst)
+        
+        self.assertFalse(os.path.exists(self.src))
+        with open(self.dst, "rb") as f:
+            self.assertEqual(f.read(), b"audio")
+    
+    @patch('src.utils.file_utils.os.replace')
+    def test_move_file_other_errors_raise(self, mock_replace):
+        """Test that non cross-device errors are not swallowed."""
+        mock_replace.side_effect = PermissionError(errno.EACCES, "Permission denied")
+        
+        with self.assertRaises(PermissionError):
+            move_file(self.src, self.dst)
 
 
 if __name__ == "__main__":
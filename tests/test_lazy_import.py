@@ -0,0 +1,94 @@
+"""Unit tests for lazy import utilities."""
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+from src.utils.lazy_import import LazyImportTester, module_available
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyImport(unittest.TestCase):
+    """Test cases for lazy availability checks."""
+
+    def setUp(self):
+        """Clear the availability cache between tests."""
+        module_available.cache_clear()
+
+    def test_module_available_installed(self):
+        """Test that an installed module is reported as available."""
+        self.assertTrue(module_available("json"))
+
+    def test_module_available_missing(self):
+        """Test that a missing module is reported as unavailable."""
+        self.assertFalse(module_available("definitely_not_a_real_module_xyz"))
+
+    def test_module_available_missing_parent(self):
+        """Test that a dotted name with a missing parent is unavailable."""
+        self.assertFalse(module_available("definitely_not_a_real_module_xyz.sub"))
+
+    def test_module_available_is_cached(self):
+        """Test that repeated checks only search sys.path once."""
+        with patch('src.utils.lazy_import.importlib.util.find_spec') as mock_find:
+            mock_find.return_value = None
+
+            module_available("some_module")
+            module_available("some_module")
+
+            mock_find.assert_called_once_with("some_module")
+
+    def test_tester_does_not_import(self):
+        """Test that evaluating the tester doesn't import the module."""
+        sys.modules.pop("wave", None)
+
+        self.assertTrue(LazyImportTester("wave"))
+        self.assertNotIn("wave", sys.modules)
+
+    def test_tester_requires_all_modules(self):
+        """Test that the tester is False if any module is missing."""
+        self.assertTrue(LazyImportTester("json", "csv"))
+        self.assertFalse(LazyImportTester("json", "definitely_not_a_real_module_xyz"))
+
+
+class TestLazyPackageExports(unittest.TestCase):
+    """Test cases for lazy package-level re-exports."""
+
+    def test_package_import_defers_submodules(self):
+        """Test that importing a package doesn't import its submodules."""
+        code = (
+            "import sys\n"
+            "import src.audio, src.downloader, src.scrapers\n"
+            "print(sorted(m for m in ('src.audio.analysis', 'src.audio.stem_splitter',\n"
+            "    'src.downloader.youtube', 'src.scrapers.tunebat') if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_ROOT,
+            check=True,
+            stdout=subprocess.PIPE,
+            text=True
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_package_attribute_loads_submodule(self):
+        """Test that re-exported names resolve to the submodule objects."""
+        import src.audio
+        from src.audio.stem_splitter import split_audio_stems
+
+        self.assertIs(src.audio.split_audio_stems, split_audio_stems)
+        self.assertIn("analyze_audio_bpm_key", dir(src.audio))
+        # Later lookups skip __getattr__
+        self.assertIs(vars(src.audio)["split_audio_stems"], split_audio_stems)
+
+    def test_package_unknown_attribute(self):
+        """Test that unknown names still raise AttributeError."""
+        import src.audio
+
+        with self.assertRaises(AttributeError):
+            src.audio.not_a_real_name
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -54,6 +54,22 @@ class TestSanitization(unittest.TestCase):
         self.assertIn("Song", result)
         self.assertIn("with", result)
         self.assertIn("symbols", result)
+    
+    def test_sanitize_keeps_unicode_word_characters(self):
+        """Test that non-ASCII letters and digits are kept."""
+        result = sanitize_filename("Café Ünïcode 東京 ٣")
+        self.assertEqual(result, "Café Ünïcode 東京 ٣")
+    
+    def test_sanitize_unicode_whitespace(self):
+        """Test that non-ASCII whitespace collapses to a single space."""
+        result = sanitize_filename("Tab\tand\u00a0\u2003Space")
+        self.assertEqual(result, "Tab and Space")
+    
+    def test_sanitize_ascii_fast_path_matches_unicode_path(self):
+        """Test that ASCII input gives the same result on either path."""
+        printable = "".join(chr(c) for c in range(32, 127))
+        # A trailing non-ASCII letter forces the str.translate path
+        self.assertEqual(sanitize_filename(printable) + "é", sanitize_filename(printable + "é"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+"""Unit tests for the TuneBat result cache."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.scrapers import _cache
+
+
+class TestScraperCache(unittest.TestCase):
+    """Test cases for the on-disk scrape cache."""
+    
+    def setUp(self):
+        """Point the cache at a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        
+        patcher = patch('src.scrapers._cache.get_cache_dir', return_value=self.temp_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(_cache.close)
+    
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_store_and_load(self):
+        """Test a stored result can be loaded back."""
+        self.assertIsNone(_cache.load_cached_info("Test Song"))
+        
+        _cache.store_cached_info("Test Song", "128", "A Minor", "8A")
+        
+        self.assertEqual(_cache.load_cached_info("Test Song"), ("128", "A Minor", "8A"))
+    
+    def test_key_normalizes_title(self):
+        """Test that case and spacing differences share an entry."""
+        _cache.store_cached_info("Artist  - Song ", "120", "C Major", "8B")
+        
+        self.assertEqual(_cache.load_cached_info("artist - SONG"), ("120", "C Major", "8B"))
+    
+    def test_key_keeps_punctuation(self):
+        """Test that titles differing in punctuation don't share an entry."""
+        _cache.store_cached_info("AC/DC - X", "120", "C Major", "8B")
+        _cache.store_cached_info("Song?", "90", "D Minor", "7A")
+        
+        self.assertIsNone(_cache.load_cached_info("ACDC - X"))
+        self.assertIsNone(_cache.load_cached_info("Song"))
+    
+    def test_store_replaces_entry(self):
+        """Test that a newer result replaces the old one."""
+        _cache.store_cached_info("Test Song", "128", None, None)
+        _cache.store_cached_info("Test Song", "128", "A Minor", "8A")
+        
+        self.assertEqual(_cache.load_cached_info("Test Song"), ("128", "A Minor", "8A"))
+    
+    def test_max_age(self):
+        """Test that entries older than max_age are ignored."""
+        with patch('src.scrapers._cache.time.time', return_value=1000.0):
+            _cache.store_cached_info("Test Song", "128", "A Minor", "8A")
+        
+        with patch('src.scrapers._cache.time.time', return_value=1100.0):
+            self.assertIsNone(_cache.load_cached_info("Test Song", max_age=50))
+            self.assertIsNotNone(_cache.load_cached_info("Test Song", max_age=500))
+    
+    def test_persists_across_connections(self):
+        """Test that results survive reopening the database."""
+        _cache.store_cached_info("Test Song", "128", "A Minor", "8A")
+        _cache.close()
+        
+        self.assertEqual(_cache.load_cached_info("Test Song"), ("128", "A Minor", "8A"))
+    
+    def test_cookies_round_trip(self):
+        """Test that saved cookies are loaded back."""
+        self.assertEqual(_cache.load_cookies(), [])
+        
+        cookies = [{"name": "cf_clearance", "value": "abc", "expiry": 4102444800}]
+        _cache.store_cookies(cookies)
+        
+        self.assertEqual(_cache.load_cookies(), cookies)
+        self.assertEqual(os.listdir(self.temp_dir), ["tunebat-cookies.json"])
+    
+    def test_corrupt_cookie_file_ignored(self):
+        """Test that an unreadable cookie file counts as no cookies."""
+        with open(os.path.join(self.temp_dir, "tunebat-cookies.json"), "w") as f:
+            f.write("{not json")
+        
+        self.assertEqual(_cache.load_cookies(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,70 @@
 
 import unittest
 import os
+import subprocess
 import tempfile
 from unittest.mock import patch, MagicMock, call
-from src.audio.stem_splitter import split_audio_stems
+from src.audio.stem_splitter import split_audio_stems, _run_with_progress, DEMUCS_AVAILABLE
+from tests._helpers import argv_flag
+
+
+CWD = "/current/dir"
+
+
+def _stem_paths(output_dir: str, basename: str = "song"):
+    """Return the vocals and no_vocals paths Demucs writes for a track."""
+    stem_folder = os.path.join(output_dir, "htdemucs", basename)
+    return [
+        os.path.join(stem_folder, "vocals.wav"),
+        os.path.join(stem_folder, "no_vocals.wav"),
+    ]
+
+
+class FakeFS:
+    """
+    In-memory stand-in for the files the stem splitter touches.
+    
+    Existing files are a set of paths, so exists() is a set lookup. Running
+    the Demucs command creates demucs_outputs, and remove/move_file update
+    the set. The patched callables are kept as attributes for assertions.
+    """
+    
+    def __init__(self, existing=(), demucs_outputs=()):
+        self.paths = set(existing)
+        self.demucs_outputs = list(demucs_outputs)
+        self._patchers = []
+    
+    def __enter__(self):
+        def remove(path):
+            if path not in self.paths:
+                raise FileNotFoundError(path)
+            self.paths.remove(path)
+        
+        def move(src, dst):
+            self.paths.remove(src)
+            self.paths.add(dst)
+        
+        def run(cmd):
+            self.paths.update(self.demucs_outputs)
+        
+        for name, attr, kwargs in [
+            ('os.getcwd', 'getcwd', {'return_value': CWD}),
+            ('os.path.exists', 'exists', {'side_effect': self.paths.__contains__}),
+            ('os.makedirs', 'makedirs', {}),
+            ('os.remove', 'remove', {'side_effect': remove}),
+            ('move_file', 'move', {'side_effect': move}),
+            ('run_command', 'run', {'side_effect': run}),
+        ]:
+            patcher = patch(f'src.audio.stem_splitter.{name}', **kwargs)
+            setattr(self, attr, patcher.start())
+            self._patchers.append(patcher)
+        return self
+    
+    def __exit__(self, *exc_info):
+        for patcher in reversed(self._patchers):
+            patcher.stop()
+        self._patchers.clear()
+        return False
 
 
 class TestStemSplitter(unittest.TestCase):
@@ -13,108 +74,206 @@ class TestStemSplitter(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures."""
         self.temp_dir = tempfile.mkdtemp()
+        
+        # Exercise the CLI path unless a test opts into the in-process model
+        patcher = patch('src.audio.stem_splitter._get_model', return_value=None)
+        self.mock_get_model = patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        patcher = patch('src.audio.stem_splitter.get_torch_device', return_value=None)
+        self.mock_get_device = patcher.start()
+        self.addCleanup(patcher.stop)
     
-    @patch('src.audio.stem_splitter.os.getcwd')
-    @patch('src.audio.stem_splitter.run_command')
-    @patch('src.audio.stem_splitter.shutil.rmtree')
-    @patch('src.audio.stem_splitter.os.makedirs')
-    @patch('src.audio.stem_splitter.os.path.exists')
-    @patch('src.audio.stem_splitter.shutil.copyfile')
-    def test_split_audio_stems_success(
-        self, mock_copy, mock_exists, mock_makedirs, mock_rmtree, mock_run, mock_getcwd
-    ):
+    def test_split_audio_stems_success(self):
         """Test successful stem splitting."""
         input_path = "/path/to/song.wav"
-        mock_getcwd.return_value = "/current/dir"
-        
-        # Mock file existence checks
-        def exists_side_effect(path):
-            # Output dir exists initially, then stem files exist
-            if "demucs_output" in path and "htdemucs" not in path:
-                return True
-            if "vocals.wav" in path or "no_vocals.wav" in path:
-                return True
-            return False
+        stems = _stem_paths(os.path.join(CWD, "demucs_output"))
         
-        mock_exists.side_effect = exists_side_effect
-        
-        vocals, instrumental = split_audio_stems(input_path)
+        with FakeFS(demucs_outputs=stems) as fs:
+            vocals, instrumental = split_audio_stems(input_path)
         
         # Verify Demucs command was called
-        expected_cmd = [
-            "demucs",
-            "--two-stems", "vocals",
-            "-o", unittest.mock.ANY,
-            input_path
-        ]
-        mock_run.assert_called_once()
-        actual_cmd = mock_run.call_args[0][0]
+        fs.run.assert_called_once()
+        actual_cmd = fs.run.call_args[0][0]
         self.assertEqual(actual_cmd[0], "demucs")
         self.assertIn("--two-stems", actual_cmd)
         self.assertIn("vocals", actual_cmd)
+        self.assertEqual(actual_cmd[-1], input_path)
         
         # Verify output files contain the basename
         self.assertTrue(vocals.endswith("song_vocals.wav"))
         self.assertTrue(instrumental.endswith("song_instrumental.wav"))
         
-        # Verify files were copied
-        self.assertEqual(mock_copy.call_count, 2)
+        # Verify files were moved
+        self.assertEqual(fs.move.call_count, 2)
+        self.assertEqual(fs.paths, {vocals, instrumental})
     
-    @patch('src.audio.stem_splitter.run_command')
-    @patch('src.audio.stem_splitter.os.path.exists')
-    def test_split_audio_missing_output_files(self, mock_exists, mock_run):
-        """Test error when expected output files are missing."""
-        input_path = "/path/to/song.wav"
+    def test_split_audio_keeps_existing_output_dir(self):
+        """Test that only stale stems are removed, not the output tree."""
+        stems = _stem_paths("/custom/output")
+        other = "/custom/output/htdemucs/other/vocals.wav"
         
-        # Mock that output files don't exist
-        mock_exists.return_value = False
+        with FakeFS(existing=stems + [other], demucs_outputs=stems) as fs:
+            split_audio_stems("/path/to/song.wav", output_dir="/custom/output")
         
-        with patch('src.audio.stem_splitter.os.makedirs'):
+        fs.makedirs.assert_called_once_with("/custom/output", exist_ok=True)
+        removed = [c.args[0] for c in fs.remove.call_args_list]
+        self.assertEqual(removed, stems)
+        self.assertIn(other, fs.paths)
+    
+    def test_split_audio_missing_output_files(self):
+        """Test error when expected output files are missing."""
+        with FakeFS():
             with self.assertRaises(FileNotFoundError):
-                split_audio_stems(input_path)
+                split_audio_stems("/path/to/song.wav")
     
-    @patch('src.audio.stem_splitter.run_command')
-    @patch('src.audio.stem_splitter.os.path.exists')
-    @patch('src.audio.stem_splitter.os.makedirs')
-    @patch('src.audio.stem_splitter.shutil.rmtree')
-    @patch('src.audio.stem_splitter.shutil.copyfile')
-    def test_split_audio_custom_output_dir(
-        self, mock_copy, mock_rmtree, mock_makedirs, mock_exists, mock_run
-    ):
+    def test_split_audio_custom_output_dir(self):
         """Test stem splitting with custom output directory."""
-        input_path = "/path/to/song.wav"
         custom_output = "/custom/output"
         
-        mock_exists.side_effect = lambda p: "vocals.wav" in p or "no_vocals.wav" in p
-        
-        split_audio_stems(input_path, output_dir=custom_output)
+        with FakeFS(demucs_outputs=_stem_paths(custom_output)) as fs:
+            split_audio_stems("/path/to/song.wav", output_dir=custom_output)
         
         # Verify custom output directory was used
-        actual_cmd = mock_run.call_args[0][0]
-        self.assertIn("-o", actual_cmd)
-        idx = actual_cmd.index("-o")
-        self.assertEqual(actual_cmd[idx + 1], custom_output)
+        actual_cmd = fs.run.call_args[0][0]
+        self.assertEqual(argv_flag(actual_cmd, "-o"), custom_output)
     
-    @patch('src.audio.stem_splitter.run_command')
-    @patch('src.audio.stem_splitter.os.path.exists')
-    @patch('src.audio.stem_splitter.os.makedirs')
-    @patch('src.audio.stem_splitter.shutil.rmtree')
-    @patch('src.audio.stem_splitter.shutil.copyfile')
-    def test_split_audio_different_stem_type(
-        self, mock_copy, mock_rmtree, mock_makedirs, mock_exists, mock_run
-    ):
+    def test_split_audio_different_stem_type(self):
         """Test stem splitting with different stem type."""
-        input_path = "/path/to/song.wav"
+        stems = _stem_paths(os.path.join(CWD, "demucs_output"))
         
-        mock_exists.side_effect = lambda p: "vocals.wav" in p or "no_vocals.wav" in p
-        
-        split_audio_stems(input_path, stem_type="drums")
+        with FakeFS(demucs_outputs=stems) as fs:
+            split_audio_stems("/path/to/song.wav", stem_type="drums")
         
         # Verify stem type was used
-        actual_cmd = mock_run.call_args[0][0]
-        self.assertIn("--two-stems", actual_cmd)
-        idx = actual_cmd.index("--two-stems")
-        self.assertEqual(actual_cmd[idx + 1], "drums")
+        actual_cmd = fs.run.call_args[0][0]
+        self.assertEqual(argv_flag(actual_cmd, "--two-stems"), "drums")
+    
+    def test_split_audio_uses_accelerator(self):
+        """Test that Demucs is pointed at a GPU backend when one is available."""
+        self.mock_get_device.return_value = "mps"
+        stems = _stem_paths(os.path.join(CWD, "demucs_output"))
+        
+        with FakeFS(demucs_outputs=stems) as fs:
+            split_audio_stems("/path/to/song.wav")
+        
+        actual_cmd = fs.run.call_args[0][0]
+        self.assertEqual(argv_flag(actual_cmd, "-d"), "mps")
+    
+    @patch('src.audio.stem_splitter.os.getcwd')
+    @patch('src.audio.stem_splitter.run_command')
+    @patch('src.audio.stem_splitter._separate_in_process')
+    def test_split_audio_in_process(self, mock_separate, mock_run, mock_getcwd):
+        """Test that a loaded model is used instead of the Demucs CLI."""
+        mock_getcwd.return_value = "/current/dir"
+        model = MagicMock()
+        self.mock_get_model.return_value = model
+        
+        vocals, instrumental = split_audio_stems("/path/to/song.wav")
+        
+        self.assertEqual(vocals, os.path.join("/current/dir", "song_vocals.wav"))
+        self.assertEqual(instrumental, os.path.join("/current/dir", "song_instrumental.wav"))
+        mock_separate.assert_called_once_with(
+            model, "/path/to/song.wav", "vocals", vocals, instrumental
+        )
+        mock_run.assert_not_called()
+    
+    def test_split_audio_dest_dir(self):
+        """Test that stems are moved to dest_dir instead of the working directory."""
+        stems = _stem_paths(os.path.join(CWD, "demucs_output"))
+        
+        with FakeFS(demucs_outputs=stems) as fs:
+            vocals, instrumental = split_audio_stems("/path/to/song.wav", dest_dir="/tracks")
+        
+        self.assertEqual(vocals, os.path.join("/tracks", "song_vocals.wav"))
+        self.assertEqual(instrumental, os.path.join("/tracks", "song_instrumental.wav"))
+        self.assertEqual(fs.paths, {vocals, instrumental})
+    
+    @patch('src.audio.stem_splitter._run_with_progress')
+    def test_split_audio_reports_cli_progress(self, mock_run_with_progress):
+        """Test that a progress callback switches to the progress-reading runner."""
+        on_progress = MagicMock()
+        stems = _stem_paths(os.path.join(CWD, "demucs_output"))
+        
+        with FakeFS() as fs:
+            mock_run_with_progress.side_effect = lambda cmd, callback: fs.paths.update(stems)
+            split_audio_stems("/path/to/song.wav", on_progress=on_progress)
+        
+        fs.run.assert_not_called()
+        cmd, callback = mock_run_with_progress.call_args[0]
+        self.assertEqual(cmd[0], "demucs")
+        self.assertIs(callback, on_progress)
+    
+    @patch('src.audio.stem_splitter._separate_in_process')
+    def test_split_audio_in_process_reports_done(self, mock_separate):
+        """Test that an in-process split reports completion."""
+        self.mock_get_model.return_value = MagicMock()
+        on_progress = MagicMock()
+        
+        with FakeFS():
+            split_audio_stems("/path/to/song.wav", dest_dir="/tracks", on_progress=on_progress)
+        
+        on_progress.assert_called_once_with(100)
+    
+    @patch('src.audio.stem_splitter.subprocess.Popen')
+    def test_run_with_progress_parses_percentages(self, mock_popen):
+        """Test that Demucs's tqdm percentages are passed to the callback."""
+        proc = mock_popen.return_value
+        proc.stdout = MagicMock()
+        proc.stdout.__iter__.return_value = iter([" 42%|████  | 105.3/250.8\n", "done\n"])
+        proc.wait.return_value = 0
+        on_progress = MagicMock()
+        
+        _run_with_progress(["demucs", "song.wav"], on_progress)
+        
+        self.assertEqual(on_progress.call_args_list, [call(42), call(100)])
+    
+    @patch('src.audio.stem_splitter.subprocess.Popen')
+    def test_run_with_progress_failure(self, mock_popen):
+        """Test that a failing Demucs run raises CalledProcessError."""
+        proc = mock_popen.return_value
+        proc.stdout = MagicMock()
+        proc.stdout.__iter__.return_value = iter([])
+        proc.wait.return_value = 1
+        
+        with self.assertRaises(subprocess.CalledProcessError):
+            _run_with_progress(["demucs", "song.wav"], MagicMock())
+    
+    @unittest.skipIf(not DEMUCS_AVAILABLE, "Demucs not installed")
+    def test_separate_in_process_mixes_remaining_stems(self):
+        """Test that every stem except the target is summed for the rest."""
+        import torch
+        from src.audio.stem_splitter import _separate_in_process
+        
+        model = MagicMock(
+            samplerate=44100,
+            audio_channels=2,
+            sources=["drums", "bass", "other", "vocals"]
+        )
+        # One (batch, source, channel, time) result with source i filled with i
+        separated = torch.arange(4.0).reshape(1, 4, 1, 1).expand(1, 4, 2, 8)
+        
+        with patch('demucs.audio.AudioFile') as mock_file, \
+             patch('demucs.apply.apply_model', return_value=separated) as mock_apply, \
+             patch('demucs.audio.save_audio') as mock_save:
+            mock_file.return_value.read.return_value = torch.tensor(
+                [[0.0, 1.0] * 4, [0.0, 1.0] * 4]
+            )
+            _separate_in_process(model, "/in.wav", "vocals", "/v.wav", "/i.wav")
+        
+        # Inference runs chunked with overlap instead of on the whole track
+        _, kwargs = mock_apply.call_args
+        self.assertTrue(kwargs["split"])
+        self.assertEqual(kwargs["segment"], 7.8)
+        self.assertEqual(kwargs["overlap"], 0.25)
+        
+        # Outputs are de-normalized with the mix statistics (mean 0.5, std ~0.52)
+        (vocals, vocals_path), _ = mock_save.call_args_list[0]
+        (rest, rest_path), _ = mock_save.call_args_list[1]
+        self.assertEqual((vocals_path, rest_path), ("/v.wav", "/i.wav"))
+        std = torch.tensor([0.0, 1.0] * 4).std()
+        self.assertTrue(torch.allclose(vocals, 3 * std + 0.5))
+        self.assertTrue(torch.allclose(rest, 3 * std + 3 * 0.5))
 
 
 if __name__ == "__main__":
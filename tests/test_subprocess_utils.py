@@ -2,9 +2,17 @@
 
 import unittest
 import subprocess
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from src.utils.subprocess_utils import run_command, run_command_capture
 
+# Fields of a successful subprocess.run() result; tests override them
+_OK = {"args": [], "returncode": 0, "stdout": "", "stderr": ""}
+
+
+def _completed(**overrides) -> subprocess.CompletedProcess:
+    """Build a subprocess.run() result."""
+    return subprocess.CompletedProcess(**{**_OK, **overrides})
+
 
 class TestSubprocessUtils(unittest.TestCase):
     """Test cases for subprocess utility functions."""
@@ -12,7 +20,7 @@ class TestSubprocessUtils(unittest.TestCase):
     @patch('subprocess.run')
     def test_run_command_success(self, mock_run):
         """Test successful command execution."""
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = _completed()
         
         result = run_command(["echo", "hello"])
         
@@ -22,7 +30,7 @@ class TestSubprocessUtils(unittest.TestCase):
     @patch('subprocess.run')
     def test_run_command_with_cwd(self, mock_run):
         """Test command execution with working directory."""
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = _completed()
         
         run_command(["ls"], cwd="/tmp")
         
@@ -39,11 +47,7 @@ class TestSubprocessUtils(unittest.TestCase):
     @patch('subprocess.run')
     def test_run_command_capture_success(self, mock_run):
         """Test capturing command output."""
-        mock_run.return_value = MagicMock(
-            returncode=0,
-            stdout="output text",
-            stderr=""
-        )
+        mock_run.return_value = _completed(stdout="output text")
         
         result = run_command_capture(["echo", "test"])
         
@@ -52,18 +56,40 @@ class TestSubprocessUtils(unittest.TestCase):
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            encoding="utf-8",
+            errors="replace"
         )
         self.assertEqual(result.stdout, "output text")
     
+    @patch('subprocess.run')
+    def test_run_command_capture_bytes(self, mock_run):
+        """Test that text=False leaves output undecoded."""
+        mock_run.return_value = _completed(stdout=b"raw", stderr=b"")
+        
+        result = run_command_capture(["echo", "test"], text=False)
+        
+        mock_run.assert_called_once_with(
+            ["echo", "test"],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        self.assertEqual(result.stdout, b"raw")
+    
+    def test_run_command_capture_invalid_utf8(self):
+        """Test that undecodable output is replaced rather than raising."""
+        import sys
+        
+        result = run_command_capture(
+            [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'ok\\xff')"]
+        )
+        
+        self.assertEqual(result.stdout, "ok\ufffd")
+    
     @patch('subprocess.run')
     def test_run_command_capture_with_stderr(self, mock_run):
         """Test capturing command with stderr."""
-        mock_run.return_value = MagicMock(
-            returncode=0,
-            stdout="",
-            stderr="error message"
-        )
+        mock_run.return_value = _completed(stderr="error message")
         
         result = run_command_capture(["some_command"])
         
@@ -1,53 +1,219 @@
 """Unit tests for TuneBat scraper module."""
 
+import asyncio
+import inspect
+import os
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 from src.scrapers.tunebat import (
     is_tunebat_available,
     scrape_tunebat_info,
-    TUNEBAT_AVAILABLE
+    scrape_tunebat_info_batch,
+    scrape_tunebat_info_many,
+    TUNEBAT_AVAILABLE,
+    LXML_AVAILABLE,
+    CACHE_MAX_AGE,
+    CHROME_VERSION,
+    USER_AGENT,
+    _DriverPool,
+    _create_driver,
+    _extract_track_info,
+    _fetch_page,
+    _remember_cloudflare_cookies,
+    _restore_cloudflare_cookies,
+    _try_http_scrape,
+    _parse_rate_limit_delay,
+    _rate_limit_delay,
+    _wait_for_rate_limit,
+    _wait_for_result_url,
+    _wait_for_track_info
 )
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+
+# The parts of the Selenium WebDriver API the scraper uses
+_DRIVER_API = [
+    'get', 'title', 'execute_script', 'execute_cdp_cmd', 'get_cookies',
+    'delete_all_cookies', 'find_element', 'find_elements', 'quit',
+]
+
+
+def _make_fake_driver() -> MagicMock:
+    """
+    Build a mock WebDriver limited to the real driver's API.
+    
+    spec_set makes using anything else an AttributeError, so the scraper
+    can't come to depend on attributes a real driver doesn't have.
+    """
+    return MagicMock(spec_set=_DRIVER_API)
+
+
+# (case, search result URL, driver.get error, expected result, driver quit)
+# A missing song doesn't mean the browser is broken; a failing page does
+_SCRAPE_CASES = [
+    ("found", "https://tunebat.com/Info/TestSong", None, ("128", "A Minor", "8A"), False),
+    ("no results", None, None, (None, None, None), False),
+    ("page error", "https://tunebat.com/Info/TestSong", Exception("Network error"),
+     (None, None, None), True),
+]
+
+
+def _isolate_cookies(test: unittest.TestCase) -> None:
+    """Start a test with no Cloudflare cookies in memory or on disk."""
+    for target, value in [
+        ('src.scrapers.tunebat._cookies_loaded', False),
+        ('src.scrapers.tunebat._cloudflare_cookies', {}),
+    ]:
+        patcher = patch(target, value)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+    
+    patcher = patch('src.scrapers.tunebat.load_cookies', return_value=[])
+    test.mock_load_cookies = patcher.start()
+    test.addCleanup(patcher.stop)
+    patcher = patch('src.scrapers.tunebat.store_cookies')
+    test.mock_store_cookies = patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+@unittest.skipIf(not TUNEBAT_AVAILABLE, "TuneBat dependencies not installed")
 class TestTuneBatScraper(unittest.TestCase):
     """Test cases for TuneBat scraping functionality."""
     
-    def test_is_tunebat_available(self):
-        """Test checking if TuneBat dependencies are available."""
-        result = is_tunebat_available()
-        self.assertIsInstance(result, bool)
-        self.assertEqual(result, TUNEBAT_AVAILABLE)
+    @classmethod
+    def setUpClass(cls):
+        """Replace browser startup and page parsing for the whole class."""
+        patcher = patch('src.scrapers.tunebat._create_driver')
+        cls.mock_create = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        patcher = patch('src.scrapers.tunebat._extract_track_info')
+        cls.mock_extract = patcher.start()
+        cls.addClassCleanup(patcher.stop)
     
-    @unittest.skipIf(not TUNEBAT_AVAILABLE, "TuneBat dependencies not installed")
-    @patch('src.scrapers.tunebat.Service')
-    @patch('src.scrapers.tunebat.webdriver.Chrome')
-    @patch('src.scrapers.tunebat._extract_track_info')
-    def test_scrape_tunebat_success(
-        self, mock_extract, mock_chrome, mock_service
-    ):
-        """Test successful TuneBat scraping."""
-        # Mock WebDriver
-        mock_driver = MagicMock()
-        mock_chrome.return_value = mock_driver
+    def setUp(self):
+        """Give each test its own driver pool and a fresh mock browser."""
+        self.mock_create.reset_mock(return_value=True, side_effect=True)
+        self.mock_extract.reset_mock(return_value=True, side_effect=True)
+        self.driver = _make_fake_driver()
+        self.mock_create.return_value = self.driver
+        self.mock_extract.return_value = ("128", "A Minor", "8A")
         
-        # Mock search result
-        mock_element = MagicMock()
-        mock_element.get_attribute.return_value = "https://tunebat.com/Info/TestSong"
-        mock_driver.find_element.return_value = mock_element
+        self.pool = _DriverPool(profile_root=tempfile.mkdtemp())
+        self.addCleanup(self.pool.shutdown)
+        patcher = patch('src.scrapers.tunebat._DRIVER_POOL', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         
-        # Mock extraction results
-        mock_extract.return_value = ("128", "A Minor", "8A")
+        # Start every test with an empty result cache
+        patcher = patch('src.scrapers.tunebat.load_cached_info', return_value=None)
+        self.mock_load_cached = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('src.scrapers.tunebat.store_cached_info')
+        self.mock_store_cached = patcher.start()
+        self.addCleanup(patcher.stop)
+        _isolate_cookies(self)
+        
+        # Exercise the browser path; the HTTP fast path is tested separately
+        patcher = patch('src.scrapers.tunebat._try_http_scrape', return_value=None)
+        self.mock_http_scrape = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_scrape_tunebat_success(self):
+        """Test successful TuneBat scraping."""
+        # Mock search result
+        self.driver.execute_script.return_value = "https://tunebat.com/Info/TestSong"
         
         bpm, key, camelot = scrape_tunebat_info("Test Song", silent=True)
         
         self.assertEqual(bpm, "128")
         self.assertEqual(key, "A Minor")
         self.assertEqual(camelot, "8A")
+        self.driver.get.assert_any_call("https://tunebat.com/Info/TestSong")
+        
+        # Driver is returned to the pool warm, with its cookies, for the next scrape
+        self.driver.delete_all_cookies.assert_not_called()
+        self.driver.quit.assert_not_called()
+        self.assertEqual(self.pool._idle.qsize(), 1)
+        
+        scrape_tunebat_info("Another Song", silent=True)
+        self.mock_create.assert_called_once()
+        self.assertEqual(self.pool._idle.qsize(), 1)
+    
+    def test_scrape_with_injected_driver(self):
+        """Test that a caller's driver is used and left running."""
+        own_driver = _make_fake_driver()
+        own_driver.execute_script.return_value = "https://tunebat.com/Info/TestSong"
+        
+        for title in ("Test Song", "Another Song"):
+            self.assertEqual(
+                scrape_tunebat_info(title, silent=True, driver=own_driver),
+                ("128", "A Minor", "8A")
+            )
+        
+        self.mock_create.assert_not_called()
+        own_driver.quit.assert_not_called()
+        # Not put in the pool, where another scrape could pick it up
+        self.assertTrue(self.pool._idle.empty())
+    
+    @patch('src.scrapers.tunebat.PAGE_TIMEOUT', 0)
+    def test_scrape_tunebat_outcomes(self):
+        """Test the result of a scrape and whether its browser is kept."""
+        for name, result_url, page_error, expected, driver_quit in _SCRAPE_CASES:
+            with self.subTest(name):
+                self.driver = _make_fake_driver()
+                self.mock_create.return_value = self.driver
+                self.driver.execute_script.return_value = result_url
+                self.driver.get.side_effect = page_error
+                
+                result = scrape_tunebat_info("Test Song", silent=True)
+                
+                self.assertEqual(result, expected)
+                self.assertEqual(self.driver.quit.called, driver_quit)
+                # Next case starts its own browser
+                self.pool.shutdown()
+    
+    def test_scrape_tunebat_custom_chrome_version(self):
+        """Test scraping with custom Chrome version parameter (kept for API compatibility)."""
+        self.driver.execute_script.return_value = "https://tunebat.com/Info/Test"
+        self.mock_extract.return_value = ("120", "C Major", "8B")
+        
+        scrape_tunebat_info("Test Song", chrome_version=142, silent=True)
+        
+        # Verify Chrome was initialized (chrome_version parameter is ignored in new implementation)
+        self.mock_create.assert_called_once()
+    
+    def test_scrape_tunebat_http_fast_path(self):
+        """Test that no browser is started when plain HTTP succeeds."""
+        self.mock_http_scrape.return_value = ("128", "A Minor", "8A")
+        
+        result = scrape_tunebat_info("Test Song", silent=True)
+        
+        self.assertEqual(result, ("128", "A Minor", "8A"))
+        self.mock_create.assert_not_called()
+        self.mock_store_cached.assert_called_once_with("Test Song", "128", "A Minor", "8A")
+    
+    def test_scrape_tunebat_cached(self):
+        """Test that a cached result skips both HTTP and the browser."""
+        self.mock_load_cached.return_value = ("99", "G Major", "9B")
+        
+        result = scrape_tunebat_info("Test Song", silent=True)
         
-        # Verify driver was quit
-        mock_driver.quit.assert_called_once()
+        self.assertEqual(result, ("99", "G Major", "9B"))
+        self.mock_http_scrape.assert_not_called()
+        self.mock_create.assert_not_called()
+        # Old entries expire so a bad result is eventually scraped again
+        self.mock_load_cached.assert_called_once_with("Test Song", max_age=CACHE_MAX_AGE)
+
+
+@unittest.skipIf(TUNEBAT_AVAILABLE, "Test for when dependencies are not available")
+class TestTuneBatUnavailable(unittest.TestCase):
+    """Test cases for scraping without the TuneBat dependencies."""
     
-    @unittest.skipIf(TUNEBAT_AVAILABLE, "Test for when dependencies are not available")
     def test_scrape_tunebat_no_dependencies(self):
         """Test scraping when dependencies are not available."""
         bpm, key, camelot = scrape_tunebat_info("Test Song")
@@ -55,69 +221,473 @@ class TestTuneBatScraper(unittest.TestCase):
         self.assertIsNone(bpm)
         self.assertIsNone(key)
         self.assertIsNone(camelot)
+
+
+class TestTuneBatPageHelpers(unittest.TestCase):
+    """Test cases for starting the browser and reading TuneBat pages."""
+    
+    def setUp(self):
+        """Start without saved cookies."""
+        _isolate_cookies(self)
+    
+    def test_is_tunebat_available(self):
+        """Test checking if TuneBat dependencies are available."""
+        result = is_tunebat_available()
+        self.assertIsInstance(result, bool)
+        self.assertEqual(result, bool(TUNEBAT_AVAILABLE))
+        
+        # The probe runs once; later calls come from the cache
+        hits = is_tunebat_available.cache_info().hits
+        self.assertEqual(is_tunebat_available(), result)
+        self.assertEqual(is_tunebat_available.cache_info().hits, hits + 1)
+    
+    def test_user_agent_matches_chrome_version(self):
+        """Test that the user agent reports the Chrome version scrapes default to."""
+        self.assertIn(f"Chrome/{CHROME_VERSION}.", USER_AGENT)
+        default = inspect.signature(scrape_tunebat_info).parameters["chrome_version"].default
+        self.assertEqual(default, CHROME_VERSION)
+    
+    def test_is_tunebat_available_does_not_import_selenium(self):
+        """Test that the availability check doesn't import Selenium."""
+        code = (
+            "import sys\n"
+            "from src.scrapers.tunebat import is_tunebat_available\n"
+            "is_tunebat_available()\n"
+            "print('selenium' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_ROOT,
+            check=True,
+            stdout=subprocess.PIPE,
+            text=True
+        )
+        self.assertEqual(result.stdout.strip(), "False")
     
     @unittest.skipIf(not TUNEBAT_AVAILABLE, "TuneBat dependencies not installed")
-    @patch('src.scrapers.tunebat.Service')
-    @patch('src.scrapers.tunebat.webdriver.Chrome')
-    def test_scrape_tunebat_no_results(self, mock_chrome, mock_service):
-        """Test scraping when no results are found."""
-        mock_driver = MagicMock()
-        mock_chrome.return_value = mock_driver
+    @patch('selenium.webdriver.chrome.service.Service')
+    @patch('selenium.webdriver.Chrome')
+    def test_create_driver_blocks_heavy_resources(self, mock_chrome, mock_service):
+        """Test that the browser runs headless without loading images."""
+        _create_driver("/tmp/profile")
         
-        # Simulate no search results
-        from selenium.common.exceptions import TimeoutException
-        mock_driver.find_element.side_effect = TimeoutException()
+        options = mock_chrome.call_args.kwargs["options"]
+        self.assertIn('--headless=new', options.arguments)
+        self.assertIn('--blink-settings=imagesEnabled=false', options.arguments)
+        self.assertIn('--user-data-dir=/tmp/profile', options.arguments)
+        prefs = options.experimental_options["prefs"]
+        self.assertEqual(prefs["profile.managed_default_content_settings.images"], 2)
+    
+    @unittest.skipIf(not TUNEBAT_AVAILABLE, "TuneBat dependencies not installed")
+    @patch('src.scrapers.tunebat.POLL_FREQUENCY', 0.01)
+    def test_wait_for_track_info_polls_in_browser(self):
+        """Test that the info page wait returns the info from its last poll."""
+        mock_driver = _make_fake_driver()
+        mock_driver.title = "Song - TuneBat"
+        mock_driver.execute_script.side_effect = [
+            None, {"bpm": None}, {"bpm": "128", "key": "A Minor", "camelot": "8A"}
+        ]
         
-        bpm, key, camelot = scrape_tunebat_info("Nonexistent Song", silent=True)
+        self.assertEqual(_wait_for_track_info(mock_driver), ("128", "A Minor", "8A"))
+        self.assertEqual(mock_driver.execute_script.call_count, 3)
+        mock_driver.find_elements.assert_not_called()
+    
+    @unittest.skipIf(not TUNEBAT_AVAILABLE, "TuneBat dependencies not installed")
+    @patch('src.scrapers.tunebat.POLL_FREQUENCY', 0.01)
+    def test_wait_for_track_info_key_without_bpm(self):
+        """Test that a page with a key but no BPM still returns the key."""
+        mock_driver = _make_fake_driver()
+        mock_driver.title = "Song - TuneBat"
+        mock_driver.execute_script.side_effect = [
+            {"bpm": None}, {"bpm": None, "key": "A Minor", "camelot": "8A"}
+        ]
         
-        self.assertIsNone(bpm)
-        self.assertIsNone(key)
-        self.assertIsNone(camelot)
+        self.assertEqual(_wait_for_track_info(mock_driver), (None, "A Minor", "8A"))
+        self.assertEqual(mock_driver.execute_script.call_count, 2)
+    
+    def test_extract_track_info_single_script(self):
+        """Test that track info is read in one script call."""
+        mock_driver = _make_fake_driver()
+        mock_driver.execute_script.return_value = {
+            "bpm": "128", "key": "A Minor", "camelot": "8A"
+        }
+        
+        self.assertEqual(_extract_track_info(mock_driver), ("128", "A Minor", "8A"))
+        mock_driver.execute_script.assert_called_once()
+        mock_driver.find_element.assert_not_called()
+        mock_driver.find_elements.assert_not_called()
+    
+    def test_extract_track_info_script_error(self):
+        """Test that a failing script yields no track info."""
+        mock_driver = _make_fake_driver()
+        mock_driver.execute_script.side_effect = Exception("Script error")
         
-        mock_driver.quit.assert_called_once()
+        self.assertEqual(_extract_track_info(mock_driver), (None, None, None))
     
     @unittest.skipIf(not TUNEBAT_AVAILABLE, "TuneBat dependencies not installed")
-    @patch('src.scrapers.tunebat.Service')
-    @patch('src.scrapers.tunebat.webdriver.Chrome')
-    def test_scrape_tunebat_driver_cleanup_on_error(self, mock_chrome, mock_service):
-        """Test that driver is cleaned up even on error."""
-        mock_driver = MagicMock()
-        mock_chrome.return_value = mock_driver
+    @patch('src.scrapers.tunebat.POLL_FREQUENCY', 0.01)
+    def test_wait_for_result_url_after_challenge(self):
+        """Test that the content wait is extended while Cloudflare is shown."""
+        mock_driver = _make_fake_driver()
+        mock_driver.title = "Just a moment..."
+        # Challenge page first, then the result once it clears
+        mock_driver.execute_script.side_effect = [None, "https://tunebat.com/Info/Test"]
         
-        # Simulate error during scraping
-        mock_driver.get.side_effect = Exception("Network error")
+        self.assertEqual(_wait_for_result_url(mock_driver), "https://tunebat.com/Info/Test")
+        mock_driver.find_element.assert_not_called()
+
+
+class TestHttpFastPath(unittest.TestCase):
+    """Test cases for scraping TuneBat without a browser."""
+    
+    SEARCH_HTML = '<html><body><a href="/Info/Test-Song/abc">Test Song</a></body></html>'
+    INFO_HTML = (
+        '<html><body>'
+        '<div class="yIPfN"><span class="ant-typography ant-typography-secondary">BPM</span>'
+        '<h3 class="ant-typography">128</h3></div>'
+        '<div class="yIPfN"><span class="ant-typography ant-typography-secondary">Key</span>'
+        '<h3 class="ant-typography">A Minor</h3></div>'
+        '<div class="yIPfN"><span class="ant-typography ant-typography-secondary">Camelot</span>'
+        '<h3 class="ant-typography">8A</h3></div>'
+        '</body></html>'
+    )
+    
+    def setUp(self):
+        """Start without saved cookies."""
+        _isolate_cookies(self)
+    
+    @staticmethod
+    def _response(html: str) -> MagicMock:
+        """Build a urlopen() result usable as a context manager."""
+        response = MagicMock()
+        response.__enter__.return_value.read.return_value = html.encode("utf-8")
+        return response
+    
+    @patch('src.scrapers.tunebat.urllib.request.urlopen')
+    def test_fetch_page_challenge(self, mock_urlopen):
+        """Test that a Cloudflare challenge page is treated as a miss."""
+        mock_urlopen.return_value = self._response("<title>Just a moment...</title>")
         
-        bpm, key, camelot = scrape_tunebat_info("Test Song", silent=True)
+        self.assertIsNone(_fetch_page("https://tunebat.com/Search?q=x"))
+    
+    @patch('src.scrapers.tunebat.urllib.request.urlopen')
+    def test_fetch_page_http_error(self, mock_urlopen):
+        """Test that request errors are treated as a miss."""
+        mock_urlopen.side_effect = OSError("403 Forbidden")
         
-        # Should still try to quit driver
-        mock_driver.quit.assert_called_once()
+        self.assertIsNone(_fetch_page("https://tunebat.com/Search?q=x"))
+    
+    @patch('src.scrapers.tunebat.urllib.request.urlopen')
+    def test_fetch_page_sends_cookies(self, mock_urlopen):
+        """Test that Cloudflare cookies saved by an earlier run are replayed."""
+        self.mock_load_cookies.return_value = [{"name": "cf_clearance", "value": "abc"}]
+        mock_urlopen.return_value = self._response("<html></html>")
         
-        # Should return None values
-        self.assertIsNone(bpm)
-        self.assertIsNone(key)
-        self.assertIsNone(camelot)
+        self.assertEqual(_fetch_page("https://tunebat.com/Search?q=x"), "<html></html>")
+        
+        request = mock_urlopen.call_args[0][0]
+        self.assertEqual(request.get_header("Cookie"), "cf_clearance=abc")
+    
+    @unittest.skipIf(not LXML_AVAILABLE, "lxml not installed")
+    @patch('src.scrapers.tunebat._fetch_page')
+    def test_try_http_scrape_success(self, mock_fetch):
+        """Test parsing the search and info pages."""
+        mock_fetch.side_effect = [self.SEARCH_HTML, self.INFO_HTML]
+        
+        self.assertEqual(_try_http_scrape("Test Song"), ("128", "A Minor", "8A"))
+        mock_fetch.assert_called_with("https://tunebat.com/Info/Test-Song/abc")
+    
+    @unittest.skipIf(not LXML_AVAILABLE, "lxml not installed")
+    @patch('src.scrapers.tunebat._fetch_page')
+    def test_try_http_scrape_client_rendered(self, mock_fetch):
+        """Test that a page without values falls back to the browser."""
+        mock_fetch.side_effect = [self.SEARCH_HTML, "<html><body></body></html>"]
+        
+        self.assertIsNone(_try_http_scrape("Test Song"))
+
+
+class TestDriverPool(unittest.TestCase):
+    """Test cases for the pool of reusable browser instances."""
+    
+    def setUp(self):
+        """Replace browser startup with mock drivers."""
+        patcher = patch(
+            'src.scrapers.tunebat._create_driver',
+            side_effect=lambda profile_dir: MagicMock(profile_dir=profile_dir)
+        )
+        self.mock_create = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_release_reuses_driver(self):
+        """Test that a released driver is handed out again."""
+        pool = _DriverPool(size=1)
+        
+        driver = pool.get()
+        pool.release(driver)
+        
+        self.assertIs(pool.get(), driver)
+        self.mock_create.assert_called_once()
+        driver.get.assert_called_once_with("about:blank")
+    
+    def test_release_when_full_quits_driver(self):
+        """Test that drivers beyond the pool size are quit."""
+        pool = _DriverPool(size=1)
+        first, second = pool.get(), pool.get()
+        
+        pool.release(first)
+        pool.release(second)
+        
+        first.quit.assert_not_called()
+        second.quit.assert_called_once()
+    
+    def test_driver_recycled_after_max_uses(self):
+        """Test that a driver is replaced once it reaches max_uses."""
+        pool = _DriverPool(size=1, max_uses=2)
+        
+        driver = pool.get()
+        pool.release(driver)
+        self.assertIs(pool.get(), driver)
+        pool.release(driver)
+        
+        driver.quit.assert_called_once()
+        self.assertIsNot(pool.get(), driver)
+    
+    def test_replacement_driver_reuses_profile(self):
+        """Test that a discarded driver's profile goes to its replacement."""
+        pool = _DriverPool(size=1, profile_root="/tmp/profiles")
+        
+        first = pool.get()
+        pool.discard(first)
+        second = pool.get()
+        
+        self.assertEqual(second.profile_dir, first.profile_dir)
+    
+    def test_concurrent_drivers_get_separate_profiles(self):
+        """Test that drivers in use at the same time don't share a profile."""
+        pool = _DriverPool(size=2, profile_root="/tmp/profiles")
+        
+        first, second = pool.get(), pool.get()
+        
+        self.assertNotEqual(first.profile_dir, second.profile_dir)
+    
+    def test_shutdown_removes_profiles(self):
+        """Test that shutdown deletes the profile root."""
+        profile_root = tempfile.mkdtemp()
+        pool = _DriverPool(profile_root=profile_root)
+        
+        pool.shutdown()
+        
+        self.assertFalse(os.path.exists(profile_root))
+    
+    def test_shutdown_quits_idle_drivers(self):
+        """Test that shutdown quits every idle driver."""
+        pool = _DriverPool(size=2)
+        drivers = [pool.get(), pool.get()]
+        for driver in drivers:
+            pool.release(driver)
+        
+        pool.shutdown()
+        
+        for driver in drivers:
+            driver.quit.assert_called_once()
+
+
+class TestCloudflareCookies(unittest.TestCase):
+    """Test cases for keeping Cloudflare clearance between runs."""
+    
+    CLEARANCE = {
+        "name": "cf_clearance", "value": "abc", "domain": ".tunebat.com",
+        "path": "/", "secure": True, "httpOnly": True, "expiry": 4102444800,
+    }
+    
+    def setUp(self):
+        """Start without saved cookies."""
+        _isolate_cookies(self)
+    
+    def test_remember_saves_cloudflare_cookies(self):
+        """Test that only Cloudflare cookies are written to disk."""
+        driver = _make_fake_driver()
+        driver.get_cookies.return_value = [
+            self.CLEARANCE, {"name": "session", "value": "xyz"}
+        ]
+        
+        _remember_cloudflare_cookies(driver)
+        
+        self.mock_store_cookies.assert_called_once_with([self.CLEARANCE])
+    
+    def test_remember_skips_unchanged_cookies(self):
+        """Test that the file isn't rewritten when nothing changed."""
+        self.mock_load_cookies.return_value = [self.CLEARANCE]
+        driver = _make_fake_driver()
+        driver.get_cookies.return_value = [dict(self.CLEARANCE)]
+        
+        _remember_cloudflare_cookies(driver)
+        
+        self.mock_store_cookies.assert_not_called()
+    
+    def test_restore_sets_cookies_in_browser(self):
+        """Test that saved cookies are loaded into a new browser."""
+        self.mock_load_cookies.return_value = [self.CLEARANCE]
+        driver = _make_fake_driver()
+        
+        _restore_cloudflare_cookies(driver)
+        
+        driver.execute_cdp_cmd.assert_called_once_with("Network.setCookie", {
+            "name": "cf_clearance", "value": "abc", "domain": ".tunebat.com",
+            "path": "/", "secure": True, "httpOnly": True, "expires": 4102444800,
+        })
+    
+    def test_expired_cookies_dropped(self):
+        """Test that expired cookies aren't restored."""
+        self.mock_load_cookies.return_value = [dict(self.CLEARANCE, expiry=1)]
+        driver = _make_fake_driver()
+        
+        _restore_cloudflare_cookies(driver)
+        
+        driver.execute_cdp_cmd.assert_not_called()
+
+
+class TestTuneBatRateLimit(unittest.TestCase):
+    """Test cases for spacing out TuneBat lookups."""
+    
+    def setUp(self):
+        """Start with no previous lookup and a clock that never moves on its own."""
+        patcher = patch('src.scrapers.tunebat._last_request_time', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.dict(os.environ, {"SCRAPER_RATE_LIMIT_DELAY": "6"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        patcher = patch('src.scrapers.tunebat.time.monotonic', return_value=100.0)
+        self.mock_monotonic = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('src.scrapers.tunebat.time.sleep')
+        self.mock_sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_first_lookup_not_delayed(self):
+        """Test that the first lookup goes out immediately."""
+        _wait_for_rate_limit()
+        
+        self.mock_sleep.assert_not_called()
+    
+    def test_lookups_spaced_by_delay(self):
+        """Test that a lookup waits out the rest of the delay."""
+        self.mock_monotonic.side_effect = [100.0, 101.5]
+        
+        _wait_for_rate_limit()
+        _wait_for_rate_limit()
+        
+        self.mock_sleep.assert_called_once_with(4.5)
+    
+    def test_no_delay_after_enough_time(self):
+        """Test that no sleep happens once the delay has already passed."""
+        self.mock_monotonic.side_effect = [100.0, 107.0]
+        
+        _wait_for_rate_limit()
+        _wait_for_rate_limit()
+        
+        self.mock_sleep.assert_not_called()
+    
+    @patch.dict(os.environ, {"SCRAPER_RATE_LIMIT_DELAY": "0"})
+    def test_zero_delay_disabled(self):
+        """Test that a zero delay never sleeps."""
+        _wait_for_rate_limit()
+        _wait_for_rate_limit()
+        
+        self.mock_sleep.assert_not_called()
+    
+    def test_invalid_delay_disabled(self):
+        """Test that malformed or negative delays are ignored with a warning."""
+        # Bad values are only warned about once per process
+        _parse_rate_limit_delay.cache_clear()
+        
+        for value in ("1s", "-2", "nan"):
+            env = {"SCRAPER_RATE_LIMIT_DELAY": value}
+            with self.subTest(value), patch.dict(os.environ, env):
+                with self.assertLogs('src.scrapers.tunebat', level='WARNING'):
+                    self.assertEqual(_rate_limit_delay(), 0.0)
+                _wait_for_rate_limit()
+                _wait_for_rate_limit()
+        
+        self.mock_sleep.assert_not_called()
     
     @unittest.skipIf(not TUNEBAT_AVAILABLE, "TuneBat dependencies not installed")
-    @patch('src.scrapers.tunebat.Service')
-    @patch('src.scrapers.tunebat.webdriver.Chrome')
-    @patch('src.scrapers.tunebat._extract_track_info')
-    def test_scrape_tunebat_custom_chrome_version(
-        self, mock_extract, mock_chrome, mock_service
-    ):
-        """Test scraping with custom Chrome version parameter (kept for API compatibility)."""
-        mock_driver = MagicMock()
-        mock_chrome.return_value = mock_driver
+    @patch('src.scrapers.tunebat.load_cached_info', return_value=None)
+    @patch('src.scrapers.tunebat.store_cached_info')
+    @patch('src.scrapers.tunebat._try_http_scrape', return_value=("128", "A Minor", "8A"))
+    def test_scrapes_throttled(self, mock_http_scrape, mock_store_cached, mock_load_cached):
+        """Test that back-to-back scrapes wait the configured delay."""
+        scrape_tunebat_info("Test Song", silent=True)
+        scrape_tunebat_info("Another Song", silent=True)
         
-        mock_element = MagicMock()
-        mock_element.get_attribute.return_value = "https://tunebat.com/Info/Test"
-        mock_driver.find_element.return_value = mock_element
+        self.mock_sleep.assert_called_once_with(6.0)
+    
+    @unittest.skipIf(not TUNEBAT_AVAILABLE, "TuneBat dependencies not installed")
+    @patch('src.scrapers.tunebat.load_cached_info', return_value=("99", "G Major", "9B"))
+    def test_cached_results_not_throttled(self, mock_load_cached):
+        """Test that cache hits don't count as lookups."""
+        scrape_tunebat_info("Test Song", silent=True)
+        scrape_tunebat_info("Test Song", silent=True)
+        
+        self.mock_sleep.assert_not_called()
+
+
+class TestTuneBatBatch(unittest.TestCase):
+    """Test cases for scraping several tracks at once."""
+    
+    @patch('src.scrapers.tunebat.scrape_tunebat_info')
+    def test_batch_preserves_order(self, mock_scrape):
+        """Test that results line up with the input titles."""
+        mock_scrape.side_effect = lambda title, silent: (title, None, None)
         
-        mock_extract.return_value = ("120", "C Major", "8B")
+        results = scrape_tunebat_info_many(["One", "Two", "Three"])
         
-        scrape_tunebat_info("Test Song", chrome_version=142, silent=True)
+        self.assertEqual([r[0] for r in results], ["One", "Two", "Three"])
+        self.assertEqual(mock_scrape.call_count, 3)
+    
+    @patch('src.scrapers.tunebat.scrape_tunebat_info')
+    def test_batch_limits_concurrency(self, mock_scrape):
+        """Test that no more than max_concurrency scrapes run at once."""
+        import time
         
-        # Verify Chrome was initialized (chrome_version parameter is ignored in new implementation)
-        mock_chrome.assert_called_once()
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+        
+        def fake_scrape(title, silent):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return None, None, None
+        
+        mock_scrape.side_effect = fake_scrape
+        
+        scrape_tunebat_info_many([str(i) for i in range(6)], max_concurrency=2)
+        
+        self.assertLessEqual(peak[0], 2)
+    
+    @patch('src.scrapers.tunebat.scrape_tunebat_info')
+    def test_batch_runs_scrapes_concurrently(self, mock_scrape):
+        """Test that scrapes overlap instead of running one after another."""
+        # Each scrape waits for all the others; run in sequence, the barrier times out
+        barrier = threading.Barrier(4, timeout=5)
+        
+        def fake_scrape(title, silent):
+            barrier.wait()
+            return "128", "A Minor", "8A"
+        
+        mock_scrape.side_effect = fake_scrape
+        
+        results = asyncio.run(
+            scrape_tunebat_info_batch([str(i) for i in range(4)], max_concurrency=4)
+        )
+        
+        self.assertEqual(results, [("128", "A Minor", "8A")] * 4)
 
 
 if __name__ == "__main__":
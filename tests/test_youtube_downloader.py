@@ -1,90 +1,165 @@
 """Unit tests for YouTube downloader module."""
 
+import posixpath
 import unittest
-import os
-import tempfile
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch, sentinel, MagicMock
 from src.downloader.youtube import get_youtube_title, download_youtube_audio
+from tests._helpers import FakeCommandRunner, argv_flag
+
+# The downloader only hands the URL on to yt-dlp, so an opaque object will do
+TEST_URL = sentinel.youtube_url
+
+# Every yt-dlp call starts the same way
+_YT_DLP_PREFIX = ("yt-dlp", "--no-playlist")
+_EXPECTED_TITLE_ARGV = _YT_DLP_PREFIX + ("--print", "%(title)s", TEST_URL)
+
+
+def _fake_entry(directory: str, name: str, mtime: float) -> SimpleNamespace:
+    """Build a DirEntry-like object for os.scandir mocks."""
+    return SimpleNamespace(
+        name=name,
+        path=f"{directory}/{name}",
+        stat=lambda: SimpleNamespace(st_mtime=mtime)
+    )
+
+
+def _fake_scandir(entries: list) -> MagicMock:
+    """Wrap entries in a context manager like os.scandir returns."""
+    scandir = MagicMock()
+    scandir.__enter__.return_value = iter(entries)
+    return scandir
 
 
 class TestYouTubeDownloader(unittest.TestCase):
     """Test cases for YouTube download functionality."""
     
-    @patch('src.downloader.youtube.run_command_capture')
-    def test_get_youtube_title_success(self, mock_run):
+    @classmethod
+    def setUpClass(cls):
+        """Join paths POSIX-style so the expected paths hold on every OS."""
+        patcher = patch('src.downloader.youtube.os.path.join', new=posixpath.join)
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        
+        # yt-dlp and the output directory are faked for every test
+        cls.runner = FakeCommandRunner()
+        patcher = patch('src.downloader.youtube.run_command_capture', new=cls.runner)
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        patcher = patch('src.downloader.youtube.os.makedirs')
+        cls.mock_makedirs = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+    
+    def setUp(self):
+        """Reset the class-level mocks to a yt-dlp run that printed nothing."""
+        self.runner.reset()
+        self.mock_makedirs.reset_mock()
+        self._yt_dlp_output("")
+    
+    def _yt_dlp_output(self, stdout: str) -> None:
+        """Make every faked yt-dlp call print stdout."""
+        self.runner.expect(["yt-dlp"], stdout=stdout)
+    
+    def test_get_youtube_title_success(self):
         """Test successful title retrieval."""
-        mock_run.return_value = MagicMock(stdout="Amazing Song Title\n")
+        self._yt_dlp_output("Amazing Song Title\n")
         
-        title = get_youtube_title("https://youtube.com/watch?v=test")
+        title = get_youtube_title(TEST_URL)
         
         self.assertEqual(title, "Amazing Song Title")
-        mock_run.assert_called_once_with([
-            "yt-dlp",
-            "--no-playlist",
-            "--print",
-            "%(title)s",
-            "https://youtube.com/watch?v=test"
-        ])
+        self.assertEqual(len(self.runner.calls), 1)
+        self.assertEqual(tuple(self.runner.calls[0]), _EXPECTED_TITLE_ARGV)
     
-    @patch('src.downloader.youtube.run_command_capture')
-    def test_get_youtube_title_with_special_chars(self, mock_run):
+    def test_get_youtube_title_with_special_chars(self):
         """Test title with special characters."""
-        mock_run.return_value = MagicMock(stdout="Song (feat. Artist) - Remix\n")
+        self._yt_dlp_output("Song (feat. Artist) - Remix\n")
         
-        title = get_youtube_title("https://youtube.com/watch?v=test")
+        title = get_youtube_title(TEST_URL)
         
         self.assertEqual(title, "Song (feat. Artist) - Remix")
     
-    @patch('src.downloader.youtube.subprocess.run')
-    @patch('src.downloader.youtube.os.makedirs')
-    @patch('src.downloader.youtube.os.listdir')
-    @patch('src.downloader.youtube.os.path.getmtime')
+    @patch('src.downloader.youtube.os.path.isfile')
+    @patch('src.downloader.youtube.os.scandir')
     def test_download_youtube_audio_success(
-        self, mock_getmtime, mock_listdir, mock_makedirs, mock_run
+        self, mock_scandir, mock_isfile
     ):
         """Test successful audio download."""
-        mock_listdir.return_value = ["song.wav"]
-        mock_getmtime.return_value = 123456789
+        self._yt_dlp_output("/output/dir/song.wav\n")
+        mock_isfile.return_value = True
         
         result = download_youtube_audio(
-            "https://youtube.com/watch?v=test",
+            TEST_URL,
             "/output/dir"
         )
         
         self.assertEqual(result, "/output/dir/song.wav")
-        mock_makedirs.assert_called_once_with("/output/dir", exist_ok=True)
-        mock_run.assert_called_once()
+        self.mock_makedirs.assert_called_once_with("/output/dir", exist_ok=True)
+        self.assertEqual(len(self.runner.calls), 1)
+        
+        # Printed path is used directly, no directory scan
+        actual_cmd = self.runner.calls[0]
+        self.assertEqual(argv_flag(actual_cmd, "--print"), "after_move:filepath")
+        mock_scandir.assert_not_called()
+    
+    @patch('src.downloader.youtube.os.path.isfile')
+    def test_download_youtube_audio_download_flags(
+        self, mock_isfile
+    ):
+        """Test that parallel fragment and ffmpeg threading flags are passed."""
+        self._yt_dlp_output("/output/dir/song.wav\n")
+        mock_isfile.return_value = True
+        
+        download_youtube_audio(TEST_URL, "/output/dir")
+        
+        actual_cmd = self.runner.calls[-1]
+        self.assertEqual(tuple(actual_cmd[:len(_YT_DLP_PREFIX)]), _YT_DLP_PREFIX)
+        self.assertEqual(argv_flag(actual_cmd, "--concurrent-fragments"), "8")
+        self.assertEqual(argv_flag(actual_cmd, "--postprocessor-args"), "ffmpeg:-threads 0")
+        self.assertIn("--no-post-overwrites", actual_cmd)
+        self.assertEqual(argv_flag(actual_cmd, "-o"), "/output/dir/%(title)s.%(ext)s")
+        self.assertIs(actual_cmd[-1], TEST_URL)
     
-    @patch('src.downloader.youtube.subprocess.run')
-    @patch('src.downloader.youtube.os.makedirs')
-    @patch('src.downloader.youtube.os.listdir')
+    @patch('src.downloader.youtube.os.scandir')
     def test_download_youtube_audio_no_file_found(
-        self, mock_listdir, mock_makedirs, mock_run
+        self, mock_scandir
     ):
         """Test error when no audio file is found after download."""
-        mock_listdir.return_value = []  # No files
+        self._yt_dlp_output("")
+        mock_scandir.return_value = _fake_scandir([])  # No files
         
         with self.assertRaises(FileNotFoundError) as cm:
             download_youtube_audio(
-                "https://youtube.com/watch?v=test",
+                TEST_URL,
                 "/output/dir"
             )
         
-        self.assertIn("No WAV file found", str(cm.exception))
+        self.assertIn("No audio file found", str(cm.exception))
     
-    @patch('src.downloader.youtube.subprocess.run')
-    @patch('src.downloader.youtube.os.makedirs')
-    @patch('src.downloader.youtube.os.listdir')
-    @patch('src.downloader.youtube.os.path.getmtime')
+    def test_download_youtube_audio_keeps_original_codec(self):
+        """Test that the default download doesn't re-encode the audio."""
+        self._yt_dlp_output("")
+        
+        with patch('src.downloader.youtube.os.scandir') as mock_scandir:
+            mock_scandir.return_value = _fake_scandir([
+                _fake_entry("/output/dir", "cover.jpg", 300),
+                _fake_entry("/output/dir", "song.opus", 200),
+            ])
+            result = download_youtube_audio(TEST_URL, "/output/dir")
+        
+        self.assertEqual(result, "/output/dir/song.opus")
+        actual_cmd = self.runner.calls[-1]
+        self.assertEqual(argv_flag(actual_cmd, "--audio-format"), "best")
+    
+    @patch('src.downloader.youtube.os.path.isfile')
     def test_download_youtube_audio_custom_format(
-        self, mock_getmtime, mock_listdir, mock_makedirs, mock_run
+        self, mock_isfile
     ):
         """Test download with custom audio format."""
-        mock_listdir.return_value = ["song.mp3"]
-        mock_getmtime.return_value = 123456789
+        self._yt_dlp_output("/output/dir/song.mp3\n")
+        mock_isfile.return_value = True
         
         result = download_youtube_audio(
-            "https://youtube.com/watch?v=test",
+            TEST_URL,
             "/output/dir",
             audio_format="mp3"
         )
@@ -92,31 +167,23 @@ class TestYouTubeDownloader(unittest.TestCase):
         self.assertEqual(result, "/output/dir/song.mp3")
         
         # Verify format was passed to yt-dlp
-        actual_cmd = mock_run.call_args[0][0]
-        self.assertIn("--audio-format", actual_cmd)
-        format_idx = actual_cmd.index("--audio-format")
-        self.assertEqual(actual_cmd[format_idx + 1], "mp3")
+        actual_cmd = self.runner.calls[-1]
+        self.assertEqual(argv_flag(actual_cmd, "--audio-format"), "mp3")
     
-    @patch('src.downloader.youtube.subprocess.run')
-    @patch('src.downloader.youtube.os.makedirs')
-    @patch('src.downloader.youtube.os.listdir')
-    @patch('src.downloader.youtube.os.path.getmtime')
+    @patch('src.downloader.youtube.os.scandir')
     def test_download_youtube_audio_multiple_files(
-        self, mock_getmtime, mock_listdir, mock_makedirs, mock_run
+        self, mock_scandir
     ):
-        """Test download when multiple files exist (returns most recent)."""
-        mock_listdir.return_value = ["old_song.wav", "new_song.wav"]
-        
-        # Make new_song.wav more recent
-        def getmtime_side_effect(path):
-            if "new_song" in path:
-                return 200
-            return 100
-        
-        mock_getmtime.side_effect = getmtime_side_effect
+        """Test fallback scan when multiple files exist (returns most recent)."""
+        self._yt_dlp_output("")
+        mock_scandir.return_value = _fake_scandir([
+            _fake_entry("/output/dir", "old_song.wav", 100),
+            _fake_entry("/output/dir", "new_song.wav", 200),
+            _fake_entry("/output/dir", "newest_cover.jpg", 300),
+        ])
         
         result = download_youtube_audio(
-            "https://youtube.com/watch?v=test",
+            TEST_URL,
             "/output/dir"
         )
         
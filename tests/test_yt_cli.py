@@ -0,0 +1,76 @@
+"""Unit tests for the yt CLI's stem splitting step."""
+
+import os
+import unittest
+from unittest.mock import patch
+from src.cli.yt_cli import split_stems_with_progress
+
+TARGET_DIR = "/output/Song"
+AUDIO_PATH = os.path.join(TARGET_DIR, "song.opus")
+
+
+class FakeProgressBar:
+    """Records what the CLI does with a tqdm bar."""
+    
+    def __init__(self):
+        self.n = 0
+        self.description = ""
+        self.history = []
+    
+    def update(self, n: int) -> None:
+        self.n += n
+        self.history.append(self.n)
+    
+    def refresh(self) -> None:
+        self.history.append(self.n)
+    
+    def set_description(self, description: str) -> None:
+        self.description = description
+
+
+class TestSplitStemsWithProgress(unittest.TestCase):
+    """Test cases for the yt CLI's stem splitting step."""
+    
+    def setUp(self):
+        """Fake the progress bar and the stem splitter."""
+        self.progress_bar = FakeProgressBar()
+        
+        patcher = patch('src.audio.stem_splitter.split_audio_stems')
+        self.mock_split = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_stems_written_next_to_download(self):
+        """Test that the splitter writes the stems into the track's folder."""
+        split_stems_with_progress(AUDIO_PATH, TARGET_DIR, self.progress_bar)
+        
+        args, kwargs = self.mock_split.call_args
+        self.assertEqual(args, (AUDIO_PATH,))
+        self.assertEqual(kwargs["dest_dir"], TARGET_DIR)
+        self.assertEqual(kwargs["output_dir"], os.path.join(TARGET_DIR, "demucs_output"))
+        self.assertEqual(self.progress_bar.n, 100)
+        self.assertEqual(self.progress_bar.description, "✂️  Stems complete")
+    
+    def test_demucs_progress_moves_bar(self):
+        """Test that progress reported by the splitter advances the bar."""
+        def split(*args, on_progress, **kwargs):
+            on_progress(50)
+        
+        self.mock_split.side_effect = split
+        
+        split_stems_with_progress(AUDIO_PATH, TARGET_DIR, self.progress_bar)
+        
+        # 10 for setup, then half of the 80 Demucs spans
+        self.assertIn(50, self.progress_bar.history)
+        self.assertEqual(self.progress_bar.n, 100)
+    
+    def test_failure_reported(self):
+        """Test that a failed split is reported on the bar, not raised."""
+        self.mock_split.side_effect = FileNotFoundError("no stems")
+        
+        split_stems_with_progress(AUDIO_PATH, TARGET_DIR, self.progress_bar)
+        
+        self.assertEqual(self.progress_bar.description, "✂️  Stem split failed")
+
+
+if __name__ == "__main__":
+    unittest.main()